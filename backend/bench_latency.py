@@ -0,0 +1,111 @@
+"""
+Request latency benchmark.
+
+Sends --requests requests to each --path, keeping --concurrency in flight,
+and reports p50/p95/p99/max latency. By default the app runs in-process
+through httpx's ASGI transport, so the numbers include everything the
+handlers do, including their logging. --url targets a running server instead.
+
+To compare two revisions or settings (e.g. LOG_LEVEL=DEBUG), save one run
+and compare the other against it. The report goes to stderr, so the app's
+own output can be redirected like it would be in production:
+
+    python bench_latency.py --path /nhl/schedule --path / --save before.json > app.log
+    python bench_latency.py --path /nhl/schedule --path / --compare before.json > app.log
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else float("nan"),
+    }
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        import main
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=60)
+    results = {}
+    async with client:
+        for path in args.path:
+            for _ in range(args.warmup):
+                await client.get(path)
+            results[path] = await measure(client, path, args.requests, args.concurrency)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", action="append", help="endpoint to request (repeatable; default /nhl/schedule)")
+    parser.add_argument("--url", help="base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per path")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per path")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+    args.path = args.path or ["/nhl/schedule"]
+
+    results = asyncio.run(run(args))
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    report = sys.stderr
+    print(f"{'path':<32} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>6}", file=report)
+    for path, r in results.items():
+        print(f"{path:<32} {r['rps']:>8} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+              f"{r['max_ms']:>9.2f} {r['errors']:>6}", file=report)
+        before = baseline.get(path)
+        if before:
+            change = (r["p99_ms"] - before["p99_ms"]) / before["p99_ms"] if before["p99_ms"] else 0
+            print(f"{'':<32} p99 {before['p99_ms']:.2f} -> {r['p99_ms']:.2f} ms ({change:+.1%})", file=report)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+NFL query benchmark: EXPLAIN plans and timings for the nfl_crud queries.
+
+Seeds a scratch database with several synthetic seasons at migration 0001,
+then upgrades it through each requested revision. At each revision, every
+nfl_crud query is timed and the plan of each SQL statement it issues is
+recorded. Comparing the revision before the index migration with head
+shows what the indexes change:
+
+    python bench_nfl_queries.py --seasons 6 --revisions 0002,head
+    python bench_nfl_queries.py --database-url postgresql://localhost/nfl_bench --json plans.json
+
+The database at --database-url must be a scratch database: its NFL tables
+are dropped and recreated.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+import nfl_crud
+import nfl_models
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFERENCES = ("AFC", "NFC")
+DIVISIONS = ("East", "North", "South", "West")
+# Roster slots per team and the stat line each position produces.
+ROSTER = ["QB"] * 3 + ["RB"] * 4 + ["WR"] * 6 + ["TE"] * 3 + ["OL"] * 9 + ["DL"] * 9 + ["LB"] * 7 + \
+         ["CB"] * 6 + ["S"] * 4 + ["K", "P"]
+PLAYERS_PER_GAME = 22
+REGULAR_WEEKS = 18
+PRESEASON_WEEKS = 3
+POSTSEASON_GAMES = 13
+
+
+def _stat_line(rng: random.Random, position: str) -> Dict[str, Any]:
+    if position == "QB":
+        attempts = rng.randint(20, 45)
+        return {"attempts": attempts, "completions": int(attempts * rng.uniform(0.55, 0.75)),
+                "passing_yards": float(rng.randint(150, 400)), "passing_tds": rng.randint(0, 4),
+                "interceptions": rng.randint(0, 2), "sacks": float(rng.randint(0, 4)),
+                "sack_yards": float(rng.randint(0, 30)), "carries": rng.randint(0, 6),
+                "rushing_yards": float(rng.randint(-2, 40))}
+    if position in ("RB", "WR", "TE"):
+        targets = rng.randint(0, 12)
+        return {"carries": rng.randint(0, 22) if position == "RB" else 0,
+                "rushing_yards": float(rng.randint(0, 120)) if position == "RB" else 0.0,
+                "rushing_tds": rng.randint(0, 2), "targets": targets, "receptions": rng.randint(0, targets),
+                "receiving_yards": float(rng.randint(0, 140)), "receiving_tds": rng.randint(0, 2)}
+    if position in ("DL", "LB", "CB", "S"):
+        tackles = rng.randint(0, 9)
+        assists = rng.randint(0, 5)
+        return {"tackles": tackles, "assists": assists, "combined_tackles": tackles + assists,
+                "sacks_defense": float(rng.randint(0, 2)), "tackles_for_loss": float(rng.randint(0, 2)),
+                "qb_hits": rng.randint(0, 3), "passes_defended": rng.randint(0, 3),
+                "fumbles_forced": rng.randint(0, 1), "fumbles_recovered": rng.randint(0, 1)}
+    return {}
+
+
+def seed(engine, seasons: List[str], upcoming_season: str, seed_value: int = 7) -> Dict[str, int]:
+    """
+    Inserts 32 teams, their rosters and `seasons` of games with box scores,
+    plus an unplayed week 1 of `upcoming_season`. Returns row counts.
+    """
+    rng = random.Random(seed_value)
+    teams, players, roster = [], [], {}
+    for i in range(32):
+        team_id, abbr = str(i + 1), f"T{i + 1:02d}"
+        teams.append({"team_id": team_id, "name": f"Team {i + 1}", "abbreviation": abbr, "city": f"City {i + 1}",
+                      "conference": CONFERENCES[i // 16], "division": DIVISIONS[(i // 4) % 4]})
+        roster[team_id] = []
+        for slot, position in enumerate(ROSTER):
+            player_id = f"{abbr}-{slot:02d}"
+            roster[team_id].append((player_id, position))
+            players.append({"player_id": player_id, "full_name": f"Player {abbr} {slot}", "team": abbr,
+                            "position": position, "jersey": str(slot)})
+
+    games, stats = [], []
+
+    def add_game(season, status, week, game_date, home, away, played=True):
+        game_id = f"{season}-{status}-{len(games):05d}"
+        home_score = rng.randint(3, 38) if played else None
+        away_score = rng.randint(3, 38) if played else None
+        games.append({"game_id": game_id, "season": season, "game_date": game_date, "status": status,
+                      "week": str(week), "home_team_id": home["team_id"], "home_team_name": home["name"],
+                      "home_team_abbr": home["abbreviation"], "home_team_score": home_score,
+                      "away_team_id": away["team_id"], "away_team_name": away["name"],
+                      "away_team_abbr": away["abbreviation"], "away_team_score": away_score})
+        if not played:
+            return
+        for team in (home, away):
+            for player_id, position in rng.sample(roster[team["team_id"]], PLAYERS_PER_GAME):
+                stats.append({"player_id": player_id, "game_id": game_id, "team": team["abbreviation"],
+                              "position": position, **_stat_line(rng, position)})
+
+    def week_of_games(season, status, week, day):
+        order = teams[:]
+        rng.shuffle(order)
+        for home, away in zip(order[::2], order[1::2]):
+            add_game(season, status, week, day, home, away)
+
+    for season in seasons:
+        year = int(season)
+        for week in range(1, PRESEASON_WEEKS + 1):
+            week_of_games(season, "PRE", week, f"{year}-08-{7 * week:02d}")
+        for week in range(1, REGULAR_WEEKS + 1):
+            week_of_games(season, "REG", week, (date(year, 9, 5) + timedelta(weeks=week - 1)).isoformat())
+        for i in range(POSTSEASON_GAMES):
+            home, away = rng.sample(teams, 2)
+            add_game(season, "POST", 19 + i // 6, f"{year + 1}-01-{10 + i:02d}", home, away)
+    order = teams[:]
+    rng.shuffle(order)
+    for home, away in zip(order[::2], order[1::2]):
+        add_game(upcoming_season, "REG", 1, f"{upcoming_season}-09-07", home, away, played=False)
+
+    # Batched inserts need every row to carry the same keys; missing stats stay NULL.
+    stat_columns = [column.name for column in nfl_models.NflPlayerGameStats.__table__.columns]
+    stats = [{name: row.get(name) for name in stat_columns} for row in stats]
+    with engine.begin() as conn:
+        for model, rows in ((nfl_models.NflTeam, teams), (nfl_models.NflPlayer, players),
+                            (nfl_models.NflGame, games), (nfl_models.NflPlayerGameStats, stats)):
+            for start in range(0, len(rows), 5000):
+                conn.execute(model.__table__.insert(), rows[start:start + 5000])
+    return {"teams": len(teams), "players": len(players), "games": len(games), "player_game_stats": len(stats)}
+
+
+@contextmanager
+def capture_statements(engine):
+    statements = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+
+
+def explain(engine, statement: str, parameters) -> List[str]:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def benchmark_queries(engine, queries: Dict[str, Callable[[Session], Any]], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for name, query in queries.items():
+        try:
+            with Session(engine) as db, capture_statements(engine) as statements:
+                query(db)
+        except DBAPIError as e:
+            # The query reads a table a later revision creates.
+            results[name] = {"error": str(e.orig)}
+            continue
+        plans = [{"sql": " ".join(statement.split()), "plan": explain(engine, statement, parameters)}
+                 for statement, parameters in statements]
+        timings = []
+        for _ in range(repeat):
+            with Session(engine) as db:
+                start = time.perf_counter()
+                query(db)
+                timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3),
+                         "statements": plans}
+    return results
+
+
+def crud_queries(season: str, game_date: str, player_id: str) -> Dict[str, Callable[[Session], Any]]:
+    return {
+        "teams": lambda db: nfl_crud.get_nfl_teams(db, season=season),
+        "standings": lambda db: nfl_crud.get_nfl_standings(db, season=season),
+        "schedule_by_date": lambda db: nfl_crud.get_nfl_schedule(db, date=game_date, season=season),
+        "schedule_upcoming": lambda db: nfl_crud.get_nfl_schedule(db, upcoming=True),
+        "player_stats": lambda db: nfl_crud.get_nfl_player_stats(db, season=season),
+        "player_details": lambda db: nfl_crud.get_nfl_player_details(db, player_id),
+        "players_page": lambda db: nfl_crud.get_nfl_players(db, after=player_id),
+        "players_by_team": lambda db: nfl_crud.get_nfl_players(db, team=player_id.split("-")[0], fields=["full_name"]),
+        "players_in_season": lambda db: nfl_crud.get_nfl_players(db, season=season, position="QB"),
+        "rushing_leaders": lambda db: nfl_crud.get_nfl_rushing_leaders(db, season=season),
+        "defensive_leaders": lambda db: nfl_crud.get_nfl_defensive_leaders(db, season=season, position="LB"),
+        "yards_per_carry": lambda db: nfl_crud.get_nfl_leaders(db, "rushing_yards", season=season, aggregation="rate",
+                                                               per="carries", qualify="carries", min_qualify=50),
+        "passing_leaders": lambda db: nfl_crud.get_nfl_passing_leaders(db, season=season),
+    }
+
+
+def alembic_config(database_url: str) -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--seasons", type=int, default=6, help="seasons of games to seed, ending with 2024")
+    parser.add_argument("--revisions", default="0002,head", help="ascending migration revisions to measure at")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--plans", action=argparse.BooleanOptionalAction, default=True, help="print EXPLAIN plans")
+    parser.add_argument("--json", help="write timings and plans to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'nfl_bench.sqlite3')}"
+    config = alembic_config(database_url)
+    engine = create_engine(database_url)
+    command.downgrade(config, "base")
+    if inspect(engine).has_table("alembic_version"):
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE alembic_version")
+    command.upgrade(config, "0001")
+    seasons = [str(2024 - i) for i in reversed(range(args.seasons))]
+    counts = seed(engine, seasons, upcoming_season="2025")
+    print(f"seeded {database_url}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+    queries = crud_queries(season="2024", game_date="2024-10-10", player_id="T01-00")
+    report = {"database": engine.dialect.name, "rows": counts, "revisions": {}}
+    for revision in args.revisions.split(","):
+        start = time.perf_counter()
+        command.upgrade(config, revision)
+        # Pooled connections may have cached the schema from before the upgrade.
+        engine.dispose()
+        print(f"\n== upgraded to {revision} in {time.perf_counter() - start:.2f}s")
+        results = benchmark_queries(engine, queries, args.repeat)
+        report["revisions"][revision] = results
+        for name, result in results.items():
+            if "error" in result:
+                print(f"{name:<20} not available: {result['error']}")
+                continue
+            print(f"{name:<20} median {result['median_ms']:>9.2f} ms  min {result['min_ms']:>9.2f} ms")
+            if args.plans:
+                for statement in result["statements"]:
+                    for line in statement["plan"]:
+                        print(f"    {line}")
+
+    revisions = list(report["revisions"])
+    if len(revisions) > 1:
+        first, last = revisions[0], revisions[-1]
+        print(f"\n{'query':<20} {first:>12} {last:>12}")
+        for name in queries:
+            before = report["revisions"][first][name].get("median_ms")
+            after = report["revisions"][last][name].get("median_ms")
+            if before is None or after is None:
+                continue
+            print(f"{name:<20} {before:>9.2f} ms {after:>9.2f} ms  ({after / before if before else 0:.2f}x)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
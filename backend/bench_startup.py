@@ -0,0 +1,91 @@
+"""
+Cold-start benchmark for one API worker.
+
+Imports `main` in fresh interpreters with `-X importtime`, then reports the
+import time, the slowest modules and the resident memory after import.
+With --budget-ms / --budget-mb it exits non-zero when a budget is exceeded,
+so it can guard against startup regressions in CI.
+
+    python bench_startup.py --runs 5 --budget-ms 1200 --budget-mb 120
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+# Runs inside the child: import the app, then report peak RSS (KiB on Linux, bytes on macOS).
+CHILD_CODE = """
+import resource, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+print(f"BENCH {elapsed:.6f} {rss}")
+"""
+
+# Imports that only specific endpoints need; none of them should load at startup.
+DEFERRED_MODULES = ("matplotlib", "nhlpy", "sbrscrape")
+
+
+def run_once(module_dir):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        cwd=module_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            # A module can appear more than once; keep the largest cumulative time.
+            name = match.group(4)
+            modules[name] = max(modules.get(name, 0), int(match.group(2)))
+    bench = next(line for line in proc.stdout.splitlines() if line.startswith("BENCH "))
+    _, elapsed, rss_kib = bench.split()
+    return float(elapsed) * 1000, int(rss_kib) / 1024, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if median import time exceeds this")
+    parser.add_argument("--budget-mb", type=float, help="fail if median resident memory exceeds this")
+    args = parser.parse_args()
+
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = [run_once(module_dir) for _ in range(args.runs)]
+    import_ms = statistics.median(r[0] for r in runs)
+    rss_mb = statistics.median(r[1] for r in runs)
+    modules = runs[-1][2]
+
+    print(f"import main: median {import_ms:.0f} ms over {args.runs} runs "
+          f"(min {min(r[0] for r in runs):.0f}, max {max(r[0] for r in runs):.0f})")
+    print(f"resident memory after import: median {rss_mb:.1f} MB")
+    print("\nslowest modules by cumulative import time (last run):")
+    top = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, micros in top:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    failures = []
+    loaded = sorted(name for name in DEFERRED_MODULES if name in modules)
+    if loaded:
+        failures.append(f"deferred modules imported at startup: {', '.join(loaded)}")
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        failures.append(f"import time {import_ms:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    if args.budget_mb is not None and rss_mb > args.budget_mb:
+        failures.append(f"resident memory {rss_mb:.1f} MB exceeds budget of {args.budget_mb:.1f} MB")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
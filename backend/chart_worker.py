@@ -0,0 +1,37 @@
+"""
+Entry module of the chart render processes.
+
+ChartService's process pool pickles render_bar_chart by reference, so each
+worker imports this module, and nothing from the app, to run it. Keep its
+imports to the standard library: anything added here is loaded into every
+render process. matplotlib is imported on the first render.
+"""
+from io import BytesIO
+from typing import Sequence
+
+
+def render_bar_chart(labels: Sequence[str], values: Sequence[float], xlabel: str, ylabel: str,
+                     title: str, fmt: str = "png") -> bytes:
+    """
+    Renders a bar chart with the object-oriented Figure API, so it never
+    touches pyplot's global state and is safe to run concurrently.
+    """
+    from matplotlib import rc_context
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.bar(labels, values)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment("right")
+    fig.tight_layout()
+
+    buf = BytesIO()
+    # Keep SVG text as <text> elements instead of glyph paths; that is most of the size saving.
+    with rc_context({"svg.fonttype": "none"}):
+        fig.savefig(buf, format=fmt)
+    return buf.getvalue()
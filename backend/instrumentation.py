@@ -0,0 +1,304 @@
+"""
+Request instrumentation: where each request's time goes.
+
+- InstrumentationMiddleware (ASGI) times every request and adds a
+  Server-Timing header with that request's upstream, DB and cache figures.
+- track_upstream() wraps NHL API calls, InstrumentedNHLClient wraps a whole
+  nhlpy client, and instrument_engine() hooks SQLAlchemy cursor events.
+- TTLCache (the chart cache included) reports hits and misses through record_cache().
+
+Per-request figures live in a context variable, so they follow the request
+into run_in_threadpool/asyncio.to_thread workers. Process-wide totals are
+rendered in the Prometheus text format by render_metrics() for /metrics.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds, shared by every histogram.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "statscout"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestMetrics:
+    """
+    What one request spent, filled in by whichever thread does the work.
+    """
+    __slots__ = ("started", "upstream_calls", "upstream_seconds", "db_queries", "db_seconds",
+                 "cache_hits", "cache_misses", "_lock")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return ", ".join((
+            f"total;dur={self.elapsed() * 1000:.1f}",
+            f'upstream;dur={self.upstream_seconds * 1000:.1f};desc="{self.upstream_calls} calls"',
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ))
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_request() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        index = bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms keyed by label values.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.request_seconds: Dict[str, _Histogram] = {}
+        self.upstream: Dict[Tuple[str, str], int] = {}
+        self.upstream_seconds: Dict[str, _Histogram] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self.db_queries = 0
+        self.db_seconds = _Histogram()
+
+    def record_request(self, method: str, route: str, status: int, seconds: float):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.request_seconds.setdefault(route, _Histogram()).observe(seconds)
+
+    def record_upstream(self, endpoint: str, seconds: float, outcome: str):
+        with self._lock:
+            self.upstream[(endpoint, outcome)] = self.upstream.get((endpoint, outcome), 0) + 1
+            self.upstream_seconds.setdefault(endpoint, _Histogram()).observe(seconds)
+
+    def record_cache(self, cache: str, result: str):
+        with self._lock:
+            self.cache[(cache, result)] = self.cache.get((cache, result), 0) + 1
+
+    def record_db(self, seconds: float):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds.observe(seconds)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            _counter(lines, "http_requests_total", "Requests handled, by route and status.",
+                     (("method", "route", "status"), self.requests))
+            _histograms(lines, "http_request_duration_seconds", "Request wall time.", "route",
+                        self.request_seconds)
+            _counter(lines, "upstream_requests_total", "NHL API calls, by endpoint and outcome.",
+                     (("endpoint", "outcome"), self.upstream))
+            _histograms(lines, "upstream_request_duration_seconds", "NHL API call latency.", "endpoint",
+                        self.upstream_seconds)
+            _counter(lines, "cache_lookups_total", "Cache lookups, by cache and result (hit, stale, miss, coalesced).",
+                     (("cache", "result"), self.cache))
+            _counter(lines, "db_queries_total", "SQL statements executed.", ((), {(): self.db_queries}))
+            _histograms(lines, "db_query_duration_seconds", "SQL statement latency.", None,
+                        {None: self.db_seconds})
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _counter(lines: List[str], name: str, help_text: str, series):
+    names, values = series
+    name = f"{METRIC_PREFIX}_{name}"
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for key, count in sorted(values.items()):
+        lines.append(f"{name}{_labels(names, key)} {count}")
+
+
+def _histograms(lines: List[str], name: str, help_text: str, label: Optional[str], histograms):
+    name = f"{METRIC_PREFIX}_{name}"
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items(), key=lambda item: str(item[0])):
+        names, values = ((label,), (key,)) if label else ((), ())
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(names + ('le',), values + (bound,))} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(names + ('le',), values + ('+Inf',))} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(names, values)} {histogram.total:.6f}")
+        lines.append(f"{name}_count{_labels(names, values)} {histogram.count}")
+
+
+metrics = MetricsRegistry()
+
+
+def render_metrics() -> str:
+    return metrics.render()
+
+
+@contextmanager
+def track_upstream(endpoint: str):
+    """
+    Times one NHL API call, for the current request and the process totals.
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        metrics.record_upstream(endpoint, seconds, outcome)
+        request = _current.get()
+        if request is not None:
+            with request._lock:
+                request.upstream_calls += 1
+                request.upstream_seconds += seconds
+
+
+def record_cache(cache: str, result: str):
+    """
+    `result` is "hit", "stale", "miss" or "coalesced"; only misses count as
+    misses for the request.
+    """
+    metrics.record_cache(cache, result)
+    request = _current.get()
+    if request is not None:
+        with request._lock:
+            if result == "miss":
+                request.cache_misses += 1
+            else:
+                request.cache_hits += 1
+
+
+class _InstrumentedApi:
+    def __init__(self, api, prefix: str):
+        self._api = api
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+        endpoint = f"{self._prefix}.{name}"
+
+        def call(*args, **kwargs):
+            with track_upstream(endpoint):
+                return attr(*args, **kwargs)
+        return call
+
+
+class InstrumentedNHLClient:
+    """
+    Wraps an nhlpy NHLClient so every client.<api>.<method>(...) call is
+    tracked as upstream endpoint "<api>.<method>".
+    """
+    def __init__(self, client):
+        self._client = client
+        self._apis: Dict[str, _InstrumentedApi] = {}
+
+    def __getattr__(self, name):
+        api = self._apis.get(name)
+        if api is None:
+            api = _InstrumentedApi(getattr(self._client, name), name)
+            self._apis[name] = api
+        return api
+
+
+def instrument_engine(engine):
+    """
+    Counts and times every SQL statement run on `engine`.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("instrumentation_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["instrumentation_started"].pop()
+        metrics.record_db(seconds)
+        request = _current.get()
+        if request is not None:
+            with request._lock:
+                request.db_queries += 1
+                request.db_seconds += seconds
+
+    @event.listens_for(engine, "handle_error")
+    def error(exception_context):
+        started = exception_context.connection.info.get("instrumentation_started") \
+            if exception_context.connection is not None else None
+        if started:
+            started.pop()
+
+    return engine
+
+
+class InstrumentationMiddleware:
+    """
+    Pure ASGI middleware, so streaming responses pass through untouched.
+    Server-Timing reflects the request up to the moment headers are sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", request.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # Route templates, not raw paths, keep the label set bounded.
+            metrics.record_request(scope.get("method", ""), getattr(route, "path", "unmatched"), status,
+                                   request.elapsed())
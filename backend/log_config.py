@@ -0,0 +1,138 @@
+"""
+Logging setup for the API.
+
+Request handlers never write to stdout themselves. Records go onto an
+in-memory queue through a QueueHandler. A QueueListener thread formats and
+writes them, so a slow terminal or log pipe does not add to request latency.
+
+Settings come from the environment:
+- LOG_LEVEL is the root level (default INFO).
+- LOG_LEVELS holds per-module overrides such as "main=DEBUG,nhl_travel=WARNING".
+- LOG_FORMAT is "json" (default, one object per line) or "text".
+- LOG_SAMPLE_RATE is the fraction of per-item debug lines kept (default 0.01).
+  Lines logged with extra=SAMPLED are sampled; every other line is kept.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.01))
+
+# Pass as extra= on per-item lines (one per game, player, ...) to sample them.
+SAMPLED = {"sampled": True}
+
+# httpx logs every request at INFO, including each upstream NHL call; LOG_LEVELS can override these.
+DEFAULT_LEVELS = {"httpx": "WARNING", "httpcore": "WARNING"}
+
+# Attributes every LogRecord has; anything else on a record came from extra=.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """
+    "main=DEBUG,nhl_travel=warning" -> {"main": "DEBUG", "nhl_travel": "WARNING"}.
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, any extra= fields
+    and the formatted exception, if any.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "sampled":
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of records logged with extra=SAMPLED.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, "sampled", False) or random.random() < self.rate
+
+
+class _QueueHandler(QueueHandler):
+    # Only merge the arguments in the caller's thread (they may change after the
+    # call returns); JSON and traceback formatting happen on the listener thread.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL, levels: str = LOG_LEVELS, fmt: str = LOG_FORMAT,
+                  sample_rate: float = LOG_SAMPLE_RATE, stream=None):
+    """
+    Routes the root logger through a queue to a stream handler on a listener
+    thread. Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json"
+                        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(SampleFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    for name, module_level in {**DEFAULT_LEVELS, **parse_levels(levels)}.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """
+    Flushes queued records and stops the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
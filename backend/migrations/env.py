@@ -0,0 +1,44 @@
+"""
+Alembic environment for the NFL tables in nfl_models.
+
+The URL is taken from `sqlalchemy.url` when a caller sets it on the Config
+(bench_nfl_queries.py does), otherwise from DATABASE_URL like the app.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+import nfl_models
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = nfl_models.Base.metadata
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or nfl_models.DATABASE_URL
+
+
+def run_migrations_offline():
+    context.configure(url=database_url(), target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,109 @@
+"""
+Initial NFL schema, as nfl_models created it before migrations existed.
+
+Databases that already have these tables should be stamped instead of
+upgraded through this revision:  alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "nfl_games",
+        sa.Column("game_id", sa.String(), primary_key=True),
+        sa.Column("season", sa.String(), nullable=False),
+        sa.Column("game_date", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("week", sa.String(), nullable=False),
+        sa.Column("home_team_id", sa.String(), nullable=False),
+        sa.Column("home_team_name", sa.String(), nullable=False),
+        sa.Column("home_team_abbr", sa.String(), nullable=False),
+        sa.Column("home_team_score", sa.Integer()),
+        sa.Column("away_team_id", sa.String(), nullable=False),
+        sa.Column("away_team_name", sa.String(), nullable=False),
+        sa.Column("away_team_abbr", sa.String(), nullable=False),
+        sa.Column("away_team_score", sa.Integer()),
+    )
+    op.create_index("ix_nfl_games_game_id", "nfl_games", ["game_id"])
+
+    op.create_table(
+        "nfl_players",
+        sa.Column("player_id", sa.String(), primary_key=True),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("team", sa.String(), nullable=False),
+        sa.Column("position", sa.String(), nullable=False),
+        sa.Column("jersey", sa.String()),
+        sa.Column("birth_date", sa.String()),
+        sa.Column("height", sa.String()),
+        sa.Column("weight", sa.String()),
+        sa.Column("college", sa.String()),
+        sa.Column("experience", sa.String()),
+        sa.Column("draft_year", sa.String()),
+        sa.Column("draft_round", sa.String()),
+        sa.Column("draft_pick", sa.String()),
+        sa.Column("headshot_url", sa.String()),
+    )
+    op.create_index("ix_nfl_players_player_id", "nfl_players", ["player_id"])
+
+    op.create_table(
+        "nfl_player_game_stats",
+        sa.Column("player_id", sa.String(), sa.ForeignKey("nfl_players.player_id"), primary_key=True),
+        sa.Column("game_id", sa.String(), sa.ForeignKey("nfl_games.game_id"), primary_key=True),
+        sa.Column("team", sa.String(), nullable=False),
+        sa.Column("position", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("completions", sa.Integer()),
+        sa.Column("passing_yards", sa.Float()),
+        sa.Column("passing_tds", sa.Integer()),
+        sa.Column("interceptions", sa.Integer()),
+        sa.Column("sacks", sa.Float()),
+        sa.Column("sack_yards", sa.Float()),
+        sa.Column("carries", sa.Integer()),
+        sa.Column("rushing_yards", sa.Float()),
+        sa.Column("rushing_tds", sa.Integer()),
+        sa.Column("targets", sa.Integer()),
+        sa.Column("receptions", sa.Integer()),
+        sa.Column("receiving_yards", sa.Float()),
+        sa.Column("receiving_tds", sa.Integer()),
+        sa.Column("tackles", sa.Integer()),
+        sa.Column("assists", sa.Integer()),
+        sa.Column("combined_tackles", sa.Integer()),
+        sa.Column("sacks_defense", sa.Float()),
+        sa.Column("tackles_for_loss", sa.Float()),
+        sa.Column("qb_hits", sa.Integer()),
+        sa.Column("passes_defended", sa.Integer()),
+        sa.Column("fumbles_forced", sa.Integer()),
+        sa.Column("fumbles_recovered", sa.Integer()),
+        sa.UniqueConstraint("player_id", "game_id", name="_player_game_uc"),
+    )
+
+    op.create_table(
+        "nfl_teams",
+        sa.Column("team_id", sa.String(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("abbreviation", sa.String(), nullable=False),
+        sa.Column("city", sa.String(), nullable=False),
+        sa.Column("conference", sa.String(), nullable=False),
+        sa.Column("division", sa.String(), nullable=False),
+    )
+    op.create_index("ix_nfl_teams_team_id", "nfl_teams", ["team_id"])
+
+
+def downgrade():
+    op.drop_index("ix_nfl_teams_team_id", table_name="nfl_teams")
+    op.drop_table("nfl_teams")
+    op.drop_table("nfl_player_game_stats")
+    op.drop_index("ix_nfl_players_player_id", table_name="nfl_players")
+    op.drop_table("nfl_players")
+    op.drop_index("ix_nfl_games_game_id", table_name="nfl_games")
+    op.drop_table("nfl_games")
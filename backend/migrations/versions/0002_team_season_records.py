@@ -0,0 +1,92 @@
+"""
+Materialized per-team season records, backfilled from nfl_games.
+
+Rows are keyed by (season, team_id, team_abbr). Standings match a team's
+games by team_id and the teams view by abbreviation; nothing guarantees
+that a game's id and abbreviation agree, so each view sums over its own key.
+
+The backfill is plain SQL over this revision's nfl_games columns, so later
+changes to the models cannot alter what the revision does.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+RECORD_COLUMNS = ("games_played", "wins", "losses", "ties", "points_for", "points_against")
+REGULAR_SEASON = "REG"
+
+games = sa.table(
+    "nfl_games",
+    *(sa.column(name) for name in ("season", "status", "home_team_id", "home_team_abbr", "home_team_score",
+                                   "away_team_id", "away_team_abbr", "away_team_score")),
+)
+
+
+def _game_sides():
+    # One row per team per game: its own score and the opponent's.
+    def side(own, other):
+        return sa.select(
+            games.c.season, games.c.status,
+            games.c[f"{own}_team_id"].label("team_id"), games.c[f"{own}_team_abbr"].label("team_abbr"),
+            games.c[f"{own}_team_score"].label("own"), games.c[f"{other}_team_score"].label("opponent"),
+        )
+    return sa.union_all(side("home", "away"), side("away", "home")).subquery()
+
+
+def _record_totals(sides, prefix, condition):
+    # Scored games count towards played/wins/losses/ties; points are summed
+    # from whichever scores are present.
+    def count(predicate):
+        return sa.func.sum(sa.case((sa.and_(condition, predicate), 1), else_=0))
+
+    def total(score):
+        return sa.func.coalesce(sa.func.sum(sa.case((condition, score), else_=None)), 0)
+
+    return [
+        count(sa.and_(sides.c.own.isnot(None), sides.c.opponent.isnot(None))).label(f"{prefix}games_played"),
+        count(sides.c.own > sides.c.opponent).label(f"{prefix}wins"),
+        count(sides.c.own < sides.c.opponent).label(f"{prefix}losses"),
+        count(sides.c.own == sides.c.opponent).label(f"{prefix}ties"),
+        total(sides.c.own).label(f"{prefix}points_for"),
+        total(sides.c.opponent).label(f"{prefix}points_against"),
+    ]
+
+
+def upgrade():
+    columns = [
+        sa.Column(f"{prefix}{name}", sa.Integer(), nullable=False, server_default="0")
+        for prefix in ("", "reg_") for name in RECORD_COLUMNS
+    ]
+    op.create_table(
+        "nfl_team_season_records",
+        sa.Column("season", sa.String(), primary_key=True),
+        sa.Column("team_id", sa.String(), primary_key=True),
+        sa.Column("team_abbr", sa.String(), primary_key=True),
+        *columns,
+    )
+
+    sides = _game_sides()
+    totals = (
+        sa.select(
+            sides.c.season, sides.c.team_id, sides.c.team_abbr,
+            *_record_totals(sides, "", sa.true()),
+            *_record_totals(sides, "reg_", sides.c.status == REGULAR_SEASON),
+        )
+        .group_by(sides.c.season, sides.c.team_id, sides.c.team_abbr)
+        # A team whose games have no score at all yet gets no row.
+        .having(sa.func.count(sides.c.own) + sa.func.count(sides.c.opponent) > 0)
+    )
+    records = sa.table("nfl_team_season_records", *(sa.column(column.name) for column in totals.selected_columns))
+    op.execute(records.insert().from_select([column.name for column in totals.selected_columns], totals))
+
+
+def downgrade():
+    op.drop_table("nfl_team_season_records")
@@ -0,0 +1,42 @@
+"""
+Composite indexes for the nfl_crud query paths.
+
+- nfl_games (game_date, season): get_nfl_schedule by date, with or
+  without the season filter.
+- nfl_games (season, week, game_date): get_nfl_schedule(upcoming=True)
+  filters season and week and sorts by date.
+- nfl_games (season, game_id): every per-season stats query joins
+  nfl_player_game_stats to the season's games. The index alone yields
+  the game ids, without reading the game rows.
+- nfl_player_game_stats (game_id, player_id): the primary key leads with
+  player_id, so stats could not be found by game.
+- nfl_teams (conference, division): the ORDER BY of teams and standings.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_nfl_games_game_date_season", "nfl_games", ["game_date", "season"]),
+    ("ix_nfl_games_season_week_game_date", "nfl_games", ["season", "week", "game_date"]),
+    ("ix_nfl_games_season_game_id", "nfl_games", ["season", "game_id"]),
+    ("ix_nfl_player_game_stats_game_id_player_id", "nfl_player_game_stats", ["game_id", "player_id"]),
+    ("ix_nfl_teams_conference_division", "nfl_teams", ["conference", "division"]),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
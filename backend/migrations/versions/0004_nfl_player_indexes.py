@@ -0,0 +1,32 @@
+"""
+Indexes for paging /nfl/players by team or position.
+
+get_nfl_players orders by player_id and continues after a cursor. With
+(team, player_id) and (position, player_id), a filtered page is a range
+scan that stops after `limit` rows instead of a sort of every match.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_nfl_players_team_player_id", "nfl_players", ["team", "player_id"]),
+    ("ix_nfl_players_position_player_id", "nfl_players", ["position", "player_id"]),
+)
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,64 @@
+"""
+Per-player season stat totals for the leaderboards, backfilled from
+nfl_player_game_stats.
+
+The backfill is one INSERT ... SELECT written against this revision's
+columns, so later changes to the models cannot alter what it does.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+INTEGER_STATS = (
+    "attempts", "completions", "passing_tds", "interceptions", "carries", "rushing_tds", "targets",
+    "receptions", "receiving_tds", "tackles", "assists", "combined_tackles", "qb_hits",
+    "passes_defended", "fumbles_forced", "fumbles_recovered",
+)
+FLOAT_STATS = (
+    "passing_yards", "sacks", "sack_yards", "rushing_yards", "receiving_yards", "sacks_defense",
+    "tackles_for_loss",
+)
+INDEXED_STATS = ("passing_yards", "rushing_yards", "receiving_yards", "combined_tackles")
+STATS = INTEGER_STATS + FLOAT_STATS
+
+games = sa.table("nfl_games", sa.column("game_id"), sa.column("season"))
+stats = sa.table("nfl_player_game_stats", sa.column("player_id"), sa.column("game_id"),
+                 *(sa.column(name) for name in STATS))
+season_stats = sa.table("nfl_player_season_stats", sa.column("season"), sa.column("player_id"),
+                        sa.column("games_played"), *(sa.column(name) for name in STATS))
+
+
+def upgrade():
+    op.create_table(
+        "nfl_player_season_stats",
+        sa.Column("season", sa.String(), primary_key=True),
+        sa.Column("player_id", sa.String(), sa.ForeignKey("nfl_players.player_id"), primary_key=True),
+        sa.Column("games_played", sa.Integer(), nullable=False, server_default="0"),
+        *(sa.Column(name, sa.Integer(), nullable=False, server_default="0") for name in INTEGER_STATS),
+        *(sa.Column(name, sa.Float(), nullable=False, server_default="0") for name in FLOAT_STATS),
+    )
+    for stat in INDEXED_STATS:
+        op.create_index(f"ix_nfl_player_season_stats_season_{stat}", "nfl_player_season_stats", ["season", stat])
+
+    # games_played counts stat lines; a stat with no values totals 0.
+    totals = (
+        sa.select(
+            games.c.season, stats.c.player_id, sa.func.count(),
+            *(sa.func.coalesce(sa.func.sum(stats.c[name]), 0) for name in STATS),
+        )
+        .select_from(stats.join(games, games.c.game_id == stats.c.game_id))
+        .group_by(games.c.season, stats.c.player_id)
+    )
+    op.execute(season_stats.insert().from_select(["season", "player_id", "games_played", *STATS], totals))
+
+
+def downgrade():
+    op.drop_table("nfl_player_season_stats")
@@ -1,13 +1,18 @@
 from sqlalchemy.orm import Session
 import nfl_models
-from sqlalchemy import func, case, or_, and_
+from sqlalchemy import Float, cast, func, and_, select
 from datetime import datetime, timedelta
 
 def get_nfl_teams(db: Session, season: str = "2024"):
-    games = nfl_models.NflGame
+    """
+    Teams with their regular-season W/L (ties across all game types), read
+    from the materialized nfl_team_season_records. Games are matched to a
+    team by abbreviation.
+    """
     teams = nfl_models.NflTeam
+    records = _season_records(season, "team_abbr", ("reg_wins", "reg_losses", "ties"))
 
-    query = (
+    return (
         db.query(
             teams.team_id,
             teams.name,
@@ -15,64 +20,27 @@ def get_nfl_teams(db: Session, season: str = "2024"):
             teams.city,
             teams.conference,
             teams.division,
-            func.coalesce(
-                func.sum(
-                    case(
-                        (and_(teams.abbreviation == games.home_team_abbr, games.home_team_score > games.away_team_score, games.home_team_score != None, games.away_team_score != None, games.status == 'REG'), 1),
-                        (and_(teams.abbreviation == games.away_team_abbr, games.away_team_score > games.home_team_score, games.home_team_score != None, games.away_team_score != None, games.status == 'REG'), 1),
-                        else_=0,
-                    )
-                ),
-                0,
-            ).label("wins"),
-            func.coalesce(
-                func.sum(
-                    case(
-                        (and_(teams.abbreviation == games.home_team_abbr, games.home_team_score < games.away_team_score, games.home_team_score != None, games.away_team_score != None, games.status == 'REG'), 1),
-                        (and_(teams.abbreviation == games.away_team_abbr, games.away_team_score < games.home_team_score, games.home_team_score != None, games.away_team_score != None, games.status == 'REG'), 1),
-                        else_=0,
-                    )
-                ),
-                0,
-            ).label("losses"),
-            func.coalesce(
-                func.sum(
-                    case(
-                        (
-                            or_(
-                                teams.abbreviation == games.home_team_abbr,
-                                teams.abbreviation == games.away_team_abbr,
-                            ),
-                            case((games.home_team_score == games.away_team_score, 1), else_=0),
-                        ),
-                        else_=0,
-                    )
-                ),
-                0,
-            ).label("ties"),
-        )
-        .outerjoin(
-            games,
-            and_(
-                or_(
-                    teams.abbreviation == games.home_team_abbr,
-                    teams.abbreviation == games.away_team_abbr,
-                ),
-                games.season == season
-            ),
-        )
-        .group_by(
-            teams.team_id,
-            teams.name,
-            teams.abbreviation,
-            teams.city,
-            teams.conference,
-            teams.division,
+            func.coalesce(records.c.reg_wins, 0).label("wins"),
+            func.coalesce(records.c.reg_losses, 0).label("losses"),
+            func.coalesce(records.c.ties, 0).label("ties"),
         )
+        .outerjoin(records, records.c.team_abbr == teams.abbreviation)
         .order_by(teams.conference, teams.division)
+        .all()
     )
 
-    return query.all()
+def _season_records(season: str, team_key: str, fields):
+    """
+    `season`'s nfl_team_season_records summed per `team_key` ("team_id" or
+    "team_abbr"), as a subquery with that key and `fields`.
+    """
+    records = nfl_models.NflTeamSeasonRecord.__table__
+    return (
+        select(records.c[team_key], *(func.sum(records.c[field]).label(field) for field in fields))
+        .where(records.c.season == season)
+        .group_by(records.c[team_key])
+        .subquery()
+    )
 
 def get_nfl_schedule(db: Session, date: str = None, upcoming: bool = False, season: str = "2024"):
     query = db.query(nfl_models.NflGame)
@@ -98,139 +66,218 @@ def get_nfl_player_stats(db: Session, season: str = "2024"):
         .all()
     )
 
-def get_nfl_players(db: Session, season: str = "2024"):
-    # This function might need adjustment based on how you associate players with a season
-    # Assuming all players in nfl_players table are relevant or you have a season field in nfl_players
-    return db.query(nfl_models.NflPlayer).all()
+# Columns of each part of a player-details row, in response-schema order.
+PLAYER_COLUMNS = tuple(nfl_models.NflPlayer.__table__.columns)
+GAME_STAT_COLUMNS = tuple(nfl_models.NflPlayerGameStats.__table__.columns)
+GAME_COLUMNS = tuple(nfl_models.NflGame.__table__.columns)
+# Per-game stats summed into the season totals ("total_<name>").
+TOTALLED_STATS = tuple(
+    column.name for column in GAME_STAT_COLUMNS
+    if column.name not in ("player_id", "game_id", "team", "position")
+)
+# Names accepted by get_nfl_players(fields=...).
+PLAYER_FIELDS = tuple(column.name for column in PLAYER_COLUMNS)
 
 
-def get_nfl_player_details(db: Session, player_id: str):
-    player = db.query(nfl_models.NflPlayer).filter(nfl_models.NflPlayer.player_id == player_id).first()
-    if not player:
-        return None
+def get_nfl_players(db: Session, season: str = None, team: str = None, position: str = None,
+                    after: str = None, limit: int = 100, fields=None):
+    """
+    One page of players, ordered by player_id, as {"players": [dicts],
+    "limit": limit, "next_after": cursor or None}.
 
-    stats = (
-        db.query(
-            func.sum(nfl_models.NflPlayerGameStats.attempts).label("total_attempts"),
-            func.sum(nfl_models.NflPlayerGameStats.completions).label("total_completions"),
-            func.sum(nfl_models.NflPlayerGameStats.passing_yards).label("total_passing_yards"),
-            func.sum(nfl_models.NflPlayerGameStats.passing_tds).label("total_passing_tds"),
-            func.sum(nfl_models.NflPlayerGameStats.interceptions).label("total_interceptions"),
-            func.sum(nfl_models.NflPlayerGameStats.sacks).label("total_sacks"),
-            func.sum(nfl_models.NflPlayerGameStats.sack_yards).label("total_sack_yards"),
-            func.sum(nfl_models.NflPlayerGameStats.carries).label("total_carries"),
-            func.sum(nfl_models.NflPlayerGameStats.rushing_yards).label("total_rushing_yards"),
-            func.sum(nfl_models.NflPlayerGameStats.rushing_tds).label("total_rushing_tds"),
-            func.sum(nfl_models.NflPlayerGameStats.targets).label("total_targets"),
-            func.sum(nfl_models.NflPlayerGameStats.receptions).label("total_receptions"),
-            func.sum(nfl_models.NflPlayerGameStats.receiving_yards).label("total_receiving_yards"),
-            func.sum(nfl_models.NflPlayerGameStats.receiving_tds).label("total_receiving_tds"),
-            func.sum(nfl_models.NflPlayerGameStats.tackles).label("total_tackles"),
-            func.sum(nfl_models.NflPlayerGameStats.assists).label("total_assists"),
-            func.sum(nfl_models.NflPlayerGameStats.combined_tackles).label("total_combined_tackles"),
-            func.sum(nfl_models.NflPlayerGameStats.sacks_defense).label("total_sacks_defense"),
-            func.sum(nfl_models.NflPlayerGameStats.tackles_for_loss).label("total_tackles_for_loss"),
-            func.sum(nfl_models.NflPlayerGameStats.qb_hits).label("total_qb_hits"),
-            func.sum(nfl_models.NflPlayerGameStats.passes_defended).label("total_passes_defended"),
-            func.sum(nfl_models.NflPlayerGameStats.fumbles_forced).label("total_fumbles_forced"),
-            func.sum(nfl_models.NflPlayerGameStats.fumbles_recovered).label("total_fumbles_recovered"),
-            func.count(nfl_models.NflPlayerGameStats.game_id).label("games_played")
+    Keyset pagination: pass the previous page's next_after as `after`.
+    `season` keeps players with a stat line in one of that season's games.
+    `fields` (names from PLAYER_FIELDS) limits the columns selected;
+    player_id is always included, since it is the cursor.
+    """
+    players = nfl_models.NflPlayer
+    names = ["player_id"] + [name for name in (fields or PLAYER_FIELDS) if name != "player_id"]
+    query = select(*(players.__table__.c[name] for name in names))
+    if team:
+        query = query.where(players.team == team)
+    if position:
+        query = query.where(players.position == position)
+    if season:
+        stats = nfl_models.NflPlayerGameStats
+        query = query.where(
+            select(stats.game_id)
+            .join(nfl_models.NflGame, nfl_models.NflGame.game_id == stats.game_id)
+            .where(stats.player_id == players.player_id, nfl_models.NflGame.season == season)
+            .exists()
         )
-        .filter(nfl_models.NflPlayerGameStats.player_id == player_id)
-        .filter(nfl_models.NflGame.season == "2024") # Assuming current season stats
-        .join(nfl_models.NflGame, nfl_models.NflPlayerGameStats.game_id == nfl_models.NflGame.game_id)
-        .first()
-    )
+    if after is not None:
+        query = query.where(players.player_id > after)
+    # One extra row tells whether there is a next page.
+    rows = db.execute(query.order_by(players.player_id).limit(limit + 1)).all()
+    page = [dict(zip(names, row)) for row in rows[:limit]]
+    next_after = page[-1]["player_id"] if len(rows) > limit else None
+    return {"players": page, "limit": limit, "next_after": next_after}
 
-    game_log = (
-        db.query(nfl_models.NflPlayerGameStats, nfl_models.NflGame)
-        .join(nfl_models.NflGame, nfl_models.NflPlayerGameStats.game_id == nfl_models.NflGame.game_id)
-        .filter(nfl_models.NflPlayerGameStats.player_id == player_id)
-        .filter(nfl_models.NflGame.season == "2024") # Current season game log
-        .order_by(nfl_models.NflGame.game_date.desc())
-        .all()
+
+def get_nfl_player_details(db: Session, player_id: str, season: str = "2024"):
+    """
+    A player, their `season` game log (newest first) and season totals, as
+    plain dicts shaped like NflPlayerDetailsResponse. None if no such player.
+
+    One statement: the player row left-joined to their stat lines in that
+    season's games. Totals are summed from the game log rows in Python, with
+    SQL SUM semantics: NULLs are skipped and a stat with no values is None.
+    """
+    stats = nfl_models.NflPlayerGameStats
+    games = nfl_models.NflGame
+    # The player filter is repeated inside the nested join so the database
+    # reads this player's stat lines by primary key, not the whole season's.
+    season_lines = stats.__table__.join(
+        games.__table__,
+        and_(stats.player_id == player_id, games.game_id == stats.game_id, games.season == season),
     )
+    rows = db.execute(
+        select(*PLAYER_COLUMNS, *GAME_STAT_COLUMNS, *GAME_COLUMNS)
+        .select_from(nfl_models.NflPlayer.__table__.outerjoin(
+            season_lines, stats.player_id == nfl_models.NflPlayer.player_id))
+        .where(nfl_models.NflPlayer.player_id == player_id)
+        .order_by(games.game_date.desc())
+    ).all()
+    if not rows:
+        return None
 
-    return {"player": player, "stats": stats, "game_log": game_log}
+    player_end = len(PLAYER_COLUMNS)
+    stats_end = player_end + len(GAME_STAT_COLUMNS)
+    stat_names = [column.name for column in GAME_STAT_COLUMNS]
+    game_names = [column.name for column in GAME_COLUMNS]
+    totals = dict.fromkeys(TOTALLED_STATS)
+    game_log = []
+    for row in rows:
+        if row[player_end] is None:
+            # The outer join's single row for a player without games this season.
+            continue
+        line = dict(zip(stat_names, row[player_end:stats_end]))
+        for name in TOTALLED_STATS:
+            value = line[name]
+            if value is not None:
+                totals[name] = value if totals[name] is None else totals[name] + value
+        line["game"] = dict(zip(game_names, row[stats_end:]))
+        game_log.append(line)
+
+    season_stats = {f"total_{name}": value for name, value in totals.items()}
+    season_stats["games_played"] = len(game_log)
+    player = dict(zip((column.name for column in PLAYER_COLUMNS), rows[0][:player_end]))
+    return {"player": player, "stats": season_stats, "game_log": game_log}
 
 
 def get_nfl_standings(db: Session, season: str = "2024"):
-    # Calculate wins, losses, ties, points_for, points_against
-    # This query is a bit complex, might need adjustments based on exact schema and needs
+    """
+    Season totals over every game type, read from nfl_team_season_records.
+    Games are matched to a team by team_id.
+    """
+    teams = nfl_models.NflTeam
+    records = _season_records(season, "team_id", ("wins", "losses", "ties", "points_for", "points_against"))
+    total_wins = func.coalesce(records.c.wins, 0).label("total_wins")
 
-    home_games = (
+    return (
         db.query(
-            nfl_models.NflGame.home_team_id.label("team_id"),
-            func.sum(case((nfl_models.NflGame.home_team_score > nfl_models.NflGame.away_team_score, 1), else_=0)).label("wins"),
-            func.sum(case((nfl_models.NflGame.home_team_score < nfl_models.NflGame.away_team_score, 1), else_=0)).label("losses"),
-            func.sum(case((nfl_models.NflGame.home_team_score == nfl_models.NflGame.away_team_score, 1), else_=0)).label("ties"),
-            func.sum(nfl_models.NflGame.home_team_score).label("points_for"),
-            func.sum(nfl_models.NflGame.away_team_score).label("points_against")
+            teams.team_id,
+            teams.name,
+            teams.abbreviation,
+            teams.city,
+            teams.conference,
+            teams.division,
+            total_wins,
+            func.coalesce(records.c.losses, 0).label("total_losses"),
+            func.coalesce(records.c.ties, 0).label("total_ties"),
+            func.coalesce(records.c.points_for, 0).label("total_points_for"),
+            func.coalesce(records.c.points_against, 0).label("total_points_against"),
         )
-        .filter(nfl_models.NflGame.season == season)
-        .group_by(nfl_models.NflGame.home_team_id)
-        .subquery()
+        .outerjoin(records, records.c.team_id == teams.team_id)
+        .order_by(teams.conference, teams.division, total_wins.desc())
+        .all()
     )
 
-    away_games = (
-        db.query(
-            nfl_models.NflGame.away_team_id.label("team_id"),
-            func.sum(case((nfl_models.NflGame.away_team_score > nfl_models.NflGame.home_team_score, 1), else_=0)).label("wins"),
-            func.sum(case((nfl_models.NflGame.away_team_score < nfl_models.NflGame.home_team_score, 1), else_=0)).label("losses"),
-            func.sum(case((nfl_models.NflGame.away_team_score == nfl_models.NflGame.home_team_score, 1), else_=0)).label("ties"),
-            func.sum(nfl_models.NflGame.away_team_score).label("points_for"),
-            func.sum(nfl_models.NflGame.home_team_score).label("points_against")
-        )
-        .filter(nfl_models.NflGame.season == season)
-        .group_by(nfl_models.NflGame.away_team_id)
-        .subquery()
-    )
+LEADER_AGGREGATIONS = ("sum", "per_game", "rate")
+
 
-    # Assign total_wins to a variable for use in both select and order_by
-    total_wins = (func.coalesce(home_games.c.wins, 0) + func.coalesce(away_games.c.wins, 0)).label("total_wins")
+def get_nfl_leaders(db: Session, stat: str, season: str = "2024", aggregation: str = "sum", per: str = None,
+                    qualify: str = None, min_qualify: float = 0, position: str = None, limit: int = 50,
+                    totals=None):
+    """
+    Top `limit` players of `season` by `stat` (a name from
+    nfl_models.PLAYER_STAT_FIELDS), read from nfl_player_season_stats.
+
+    `aggregation` ranks by the season total ("sum"), the total per game
+    played ("per_game") or the total per unit of another stat `per`
+    ("rate", e.g. rushing_yards per carries; players with none are left out).
+    Players qualify with a season total of `qualify` (a stat or
+    "games_played") of at least `min_qualify`.
+
+    Rows are (NflPlayer, total_<name> for each of `totals`, games_played,
+    value); `totals` defaults to `stat` and `per`. Raises ValueError for
+    unknown stats or aggregations.
+    """
+    fields = nfl_models.PLAYER_STAT_FIELDS
+    if aggregation not in LEADER_AGGREGATIONS:
+        raise ValueError(f"aggregation must be one of {', '.join(LEADER_AGGREGATIONS)}")
+    if aggregation == "rate" and per is None:
+        raise ValueError("a rate needs a per stat")
+    totals = tuple(totals) if totals else (stat,) + ((per,) if aggregation == "rate" else ())
+    named = (stat, per, *totals, None if qualify == "games_played" else qualify)
+    unknown = [name for name in dict.fromkeys(named) if name is not None and name not in fields]
+    if unknown:
+        raise ValueError(f"Unknown stats: {', '.join(unknown)}")
+
+    rollup = nfl_models.NflPlayerSeasonStats
+    column = getattr(rollup, stat)
+    if aggregation == "sum":
+        value = column
+    elif aggregation == "per_game":
+        value = cast(column, Float) / rollup.games_played
+    else:
+        value = cast(column, Float) / getattr(rollup, per)
 
     query = (
-        db.query(
-            nfl_models.NflTeam.team_id,
-            nfl_models.NflTeam.name,
-            nfl_models.NflTeam.abbreviation,
-            nfl_models.NflTeam.city,
-            nfl_models.NflTeam.conference,
-            nfl_models.NflTeam.division,
-            total_wins,
-            (func.coalesce(home_games.c.losses, 0) + func.coalesce(away_games.c.losses, 0)).label("total_losses"),
-            (func.coalesce(home_games.c.ties, 0) + func.coalesce(away_games.c.ties, 0)).label("total_ties"),
-            (func.coalesce(home_games.c.points_for, 0) + func.coalesce(away_games.c.points_for, 0)).label("total_points_for"),
-            (func.coalesce(home_games.c.points_against, 0) + func.coalesce(away_games.c.points_against, 0)).label("total_points_against")
-        )
-        .outerjoin(home_games, nfl_models.NflTeam.team_id == home_games.c.team_id)
-        .outerjoin(away_games, nfl_models.NflTeam.team_id == away_games.c.team_id)
-        .order_by(
-            nfl_models.NflTeam.conference,
-            nfl_models.NflTeam.division,
-            total_wins.desc()
+        select(
+            nfl_models.NflPlayer,
+            *(getattr(rollup, name).label(f"total_{name}") for name in totals),
+            rollup.games_played,
+            value.label("value"),
         )
+        .join(rollup, rollup.player_id == nfl_models.NflPlayer.player_id)
+        .where(rollup.season == season, rollup.games_played > 0)
     )
+    if aggregation == "rate":
+        query = query.where(getattr(rollup, per) > 0)
+    if qualify is not None:
+        query = query.where(getattr(rollup, qualify) >= min_qualify)
+    if position:
+        query = query.where(nfl_models.NflPlayer.position == position)
+    # A plain total sorts straight off the (season, stat) indexes.
+    return db.execute(query.order_by((column if aggregation == "sum" else value).desc()).limit(limit)).all()
 
-    return query.all()
 
 def get_nfl_passing_leaders(db: Session, season: str = "2024"):
-    return (
-        db.query(
-            nfl_models.NflPlayer,
-            func.sum(nfl_models.NflPlayerGameStats.passing_yards).label("total_passing_yards"),
-            func.sum(nfl_models.NflPlayerGameStats.passing_tds).label("total_passing_tds"),
-            func.sum(nfl_models.NflPlayerGameStats.attempts).label("total_attempts"),
-            func.sum(nfl_models.NflPlayerGameStats.completions).label("total_completions"),
-            func.sum(nfl_models.NflPlayerGameStats.interceptions).label("total_interceptions"),
-            func.count(nfl_models.NflPlayerGameStats.game_id).label("games_played")
-        )
-        .join(nfl_models.NflPlayerGameStats, nfl_models.NflPlayer.player_id == nfl_models.NflPlayerGameStats.player_id)
-        .join(nfl_models.NflGame, nfl_models.NflPlayerGameStats.game_id == nfl_models.NflGame.game_id)
-        .filter(nfl_models.NflGame.season == season)
-        .group_by(nfl_models.NflPlayer.player_id)
-        .having(func.sum(nfl_models.NflPlayerGameStats.attempts) >= 100)  # Minimum 100 attempts to qualify
-        .order_by(func.sum(nfl_models.NflPlayerGameStats.passing_yards).desc())
-        .limit(50)
-        .all()
-    ) 
\ No newline at end of file
+    return get_nfl_leaders(
+        db, "passing_yards", season=season,
+        totals=("passing_yards", "passing_tds", "attempts", "completions", "interceptions"),
+        qualify="attempts", min_qualify=100,  # Minimum 100 attempts to qualify
+    )
+
+
+def get_nfl_rushing_leaders(db: Session, season: str = "2024", position: str = None, limit: int = 50):
+    return get_nfl_leaders(
+        db, "rushing_yards", season=season, position=position, limit=limit,
+        totals=("rushing_yards", "rushing_tds", "carries"),
+    )
+
+
+def get_nfl_receiving_leaders(db: Session, season: str = "2024", position: str = None, limit: int = 50):
+    return get_nfl_leaders(
+        db, "receiving_yards", season=season, position=position, limit=limit,
+        totals=("receiving_yards", "receiving_tds", "receptions", "targets"),
+    )
+
+
+def get_nfl_defensive_leaders(db: Session, season: str = "2024", position: str = None, limit: int = 50):
+    return get_nfl_leaders(
+        db, "combined_tackles", season=season, position=position, limit=limit,
+        totals=("combined_tackles", "tackles", "assists", "sacks_defense", "tackles_for_loss", "passes_defended",
+                "fumbles_forced"),
+    )
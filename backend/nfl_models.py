@@ -1,12 +1,18 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey, UniqueConstraint
+from sqlalchemy import and_, create_engine, event, func, inspect, select, Column, Index, Integer, String, Float, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, Session
 import os
+from collections import Counter, defaultdict
 from dotenv import load_dotenv
 
+from instrumentation import instrument_engine
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# NflGame.status of regular-season games.
+REGULAR_SEASON = "REG"
 
 Base = declarative_base()
 
@@ -26,6 +32,13 @@ class NflGame(Base):
     away_team_abbr = Column(String, nullable=False)
     away_team_score = Column(Integer)
 
+    # Indexes added by migrations/versions/0003_nfl_query_indexes.py.
+    __table_args__ = (
+        Index("ix_nfl_games_game_date_season", "game_date", "season"),
+        Index("ix_nfl_games_season_week_game_date", "season", "week", "game_date"),
+        Index("ix_nfl_games_season_game_id", "season", "game_id"),
+    )
+
     player_stats = relationship("NflPlayerGameStats", back_populates="game")
 
 
@@ -46,6 +59,12 @@ class NflPlayer(Base):
     draft_pick = Column(String)
     headshot_url = Column(String)
 
+    # Indexes added by migrations/versions/0004_nfl_player_indexes.py.
+    __table_args__ = (
+        Index("ix_nfl_players_team_player_id", "team", "player_id"),
+        Index("ix_nfl_players_position_player_id", "position", "player_id"),
+    )
+
     game_stats = relationship("NflPlayerGameStats", back_populates="player")
 
 
@@ -79,7 +98,10 @@ class NflPlayerGameStats(Base):
     fumbles_forced = Column(Integer)
     fumbles_recovered = Column(Integer)
 
-    __table_args__ = (UniqueConstraint('player_id', 'game_id', name='_player_game_uc'),)
+    __table_args__ = (
+        UniqueConstraint('player_id', 'game_id', name='_player_game_uc'),
+        Index("ix_nfl_player_game_stats_game_id_player_id", "game_id", "player_id"),
+    )
 
     player = relationship("NflPlayer", back_populates="game_stats")
     game = relationship("NflGame", back_populates="player_stats")
@@ -93,11 +115,429 @@ class NflTeam(Base):
     conference = Column(String, nullable=False)
     division = Column(String, nullable=False)
 
+    __table_args__ = (Index("ix_nfl_teams_conference_division", "conference", "division"),)
+
+
+class NflTeamSeasonRecord(Base):
+    """
+    Per-team season totals derived from nfl_games, one row per (team, season).
+    Rows carry both team keys of a game side: standings match teams by
+    team_id and the teams view by abbreviation, and a game's id and
+    abbreviation need not agree. With consistent data there is one row per
+    (season, team).
+    Created and backfilled by migration 0002. Game rows written through an
+    NflSession keep it current (see the flush listeners below);
+    rebuild_team_season_records() recomputes it after bulk, raw-SQL or
+    plain-Session loads (python rebuild_nfl_rollups.py).
+    """
+    __tablename__ = "nfl_team_season_records"
+    season = Column(String, primary_key=True)
+    team_id = Column(String, primary_key=True)
+    team_abbr = Column(String, primary_key=True)
+    # Every game type (preseason, regular season, postseason).
+    games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    wins = Column(Integer, nullable=False, default=0, server_default="0")
+    losses = Column(Integer, nullable=False, default=0, server_default="0")
+    ties = Column(Integer, nullable=False, default=0, server_default="0")
+    points_for = Column(Integer, nullable=False, default=0, server_default="0")
+    points_against = Column(Integer, nullable=False, default=0, server_default="0")
+    # Regular season only.
+    reg_games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    reg_wins = Column(Integer, nullable=False, default=0, server_default="0")
+    reg_losses = Column(Integer, nullable=False, default=0, server_default="0")
+    reg_ties = Column(Integer, nullable=False, default=0, server_default="0")
+    reg_points_for = Column(Integer, nullable=False, default=0, server_default="0")
+    reg_points_against = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+RECORD_FIELDS = ("games_played", "wins", "losses", "ties", "points_for", "points_against")
+# The NflGame attributes a game's contribution to the season records depends on.
+RECORD_SOURCE_ATTRS = (
+    "season", "status", "home_team_id", "home_team_abbr", "away_team_id", "away_team_abbr",
+    "home_team_score", "away_team_score",
+)
+
+
+def game_record_contributions(season, status, home_team_id, home_team_abbr, away_team_id, away_team_abbr,
+                              home_team_score, away_team_score):
+    """
+    {(season, team_id, team_abbr): Counter of RECORD_FIELDS} that one game adds to the
+    season records. A score that is still missing adds nothing but the other
+    side's points, matching SUM() over the raw games.
+    """
+    contributions = {}
+    if season is None:
+        return contributions
+    sides = (
+        (home_team_id, home_team_abbr, home_team_score, away_team_score),
+        (away_team_id, away_team_abbr, away_team_score, home_team_score),
+    )
+    for team_id, team_abbr, own, opponent in sides:
+        if team_id is None or team_abbr is None:
+            continue
+        delta = Counter()
+        if own is not None:
+            delta["points_for"] += own
+        if opponent is not None:
+            delta["points_against"] += opponent
+        if own is not None and opponent is not None:
+            delta["games_played"] += 1
+            delta["wins" if own > opponent else "losses" if own < opponent else "ties"] += 1
+        if status == REGULAR_SEASON:
+            delta.update({f"reg_{field}": value for field, value in list(delta.items())})
+        contributions[(season, team_id, team_abbr)] = delta
+    return contributions
+
+
+def _add_contributions(deltas, values, sign=1):
+    for key, delta in game_record_contributions(*values).items():
+        for field, value in delta.items():
+            deltas[key][field] += sign * value
+
+
+def _old_values(instance, names=RECORD_SOURCE_ATTRS):
+    # Values as last loaded from the database; the attributes the rollups read
+    # use active history, so a changed attribute keeps its previous value here.
+    values = []
+    for name in names:
+        history = inspect(instance).attrs[name].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            values.append(getattr(instance, name))
+    return values
+
+
+def _new_values(instance, names=RECORD_SOURCE_ATTRS):
+    return [getattr(instance, name) for name in names]
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    # Does nothing itself; registering it with active_history=True makes the ORM
+    # load an attribute's previous value before it is replaced.
+    pass
+
+
+for _name in RECORD_SOURCE_ATTRS:
+    event.listen(getattr(NflGame, _name), "set", _track_previous_value, active_history=True)
+
+
+class NflSession(Session):
+    """
+    Session class of SessionLocal. Only its flushes maintain the rollup
+    tables, so sessions elsewhere in the process pay nothing for them.
+    """
+
+
+@event.listens_for(NflSession, "before_flush")
+def _collect_record_deltas(session, flush_context, instances):
+    deltas = session.info["team_season_record_deltas"] = defaultdict(Counter)
+    for game in session.new:
+        if isinstance(game, NflGame):
+            _add_contributions(deltas, _new_values(game))
+    for game in session.deleted:
+        if isinstance(game, NflGame):
+            _add_contributions(deltas, _old_values(game), -1)
+    for game in session.dirty:
+        if isinstance(game, NflGame) and session.is_modified(game):
+            _add_contributions(deltas, _old_values(game), -1)
+            _add_contributions(deltas, _new_values(game))
+
+
+@event.listens_for(NflSession, "after_flush")
+def _apply_record_deltas(session, flush_context):
+    deltas = session.info.pop("team_season_record_deltas", None)
+    if not deltas:
+        return
+    _apply_deltas(session.connection(), NflTeamSeasonRecord.__table__, ("season", "team_id", "team_abbr"), deltas)
+
+
+def _apply_deltas(connection, table, key_columns, deltas):
+    """
+    Adds each {key tuple: Counter of column deltas} to the matching row of
+    `table`, inserting the row if it does not exist yet. On PostgreSQL and
+    SQLite this is one upsert statement (INSERT ... ON CONFLICT DO UPDATE), so
+    concurrent flushes cannot both insert the same new row; other dialects
+    lock each existing row before updating it.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    fields = sorted({field for delta in deltas.values() for field in delta})
+    rows = [
+        {**dict(zip(key_columns, key)), **{field: delta.get(field, 0) for field in fields}}
+        for key, delta in deltas.items()
+    ]
+    upsert = _UPSERTS.get(connection.dialect.name)
+    if upsert is None:
+        _apply_rows_with_locks(connection, table, key_columns, fields, rows)
+        return
+    insert = upsert(table)
+    connection.execute(
+        insert.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={field: table.c[field] + insert.excluded[field] for field in fields},
+        ),
+        rows,
+    )
+
+
+def _apply_rows_with_locks(connection, table, key_columns, fields, rows):
+    # Portable path: SELECT ... FOR UPDATE holds an existing row until the
+    # transaction ends. Two flushes creating the same new row still race, but
+    # the loser fails on the primary key instead of double counting.
+    for row in rows:
+        where = and_(*(table.c[column] == row[column] for column in key_columns))
+        found = connection.execute(select(*(table.c[column] for column in key_columns))
+                                   .where(where).with_for_update()).first()
+        if found is None:
+            connection.execute(table.insert().values(row))
+        else:
+            connection.execute(table.update().where(where)
+                               .values({field: table.c[field] + row[field] for field in fields}))
+
+
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def rebuild_team_season_records(db, season=None) -> int:
+    """
+    Recomputes nfl_team_season_records from nfl_games (one season, or all of
+    them) in the caller's transaction. Returns the number of rows written.
+    """
+    query = db.query(*(getattr(NflGame, name) for name in RECORD_SOURCE_ATTRS))
+    if season is not None:
+        query = query.filter(NflGame.season == season)
+    totals = defaultdict(Counter)
+    for values in query:
+        _add_contributions(totals, values)
+
+    records = NflTeamSeasonRecord.__table__
+    delete = records.delete()
+    if season is not None:
+        delete = delete.where(records.c.season == season)
+    db.execute(delete)
+    rows = [
+        {"season": game_season, "team_id": team_id, "team_abbr": team_abbr,
+         **{field: total.get(field, 0) for field in RECORD_FIELDS + tuple(f"reg_{f}" for f in RECORD_FIELDS)}}
+        for (game_season, team_id, team_abbr), total in totals.items()
+    ]
+    if rows:
+        db.execute(records.insert(), rows)
+    return len(rows)
+
+
+class NflPlayerSeasonStats(Base):
+    """
+    Per-player season totals of every NflPlayerGameStats stat, one row per
+    (season, player), over every game type. games_played counts stat lines.
+    Created and backfilled by migration 0005 and kept current by the NflSession
+    flush listeners below, like nfl_team_season_records;
+    rebuild_player_season_stats() recomputes it after bulk, raw-SQL or
+    plain-Session loads (python rebuild_nfl_rollups.py). Leaderboards read it instead of
+    aggregating nfl_player_game_stats.
+    """
+    __tablename__ = "nfl_player_season_stats"
+    season = Column(String, primary_key=True)
+    player_id = Column(String, ForeignKey("nfl_players.player_id"), primary_key=True)
+    games_played = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    completions = Column(Integer, nullable=False, default=0, server_default="0")
+    passing_yards = Column(Float, nullable=False, default=0, server_default="0")
+    passing_tds = Column(Integer, nullable=False, default=0, server_default="0")
+    interceptions = Column(Integer, nullable=False, default=0, server_default="0")
+    sacks = Column(Float, nullable=False, default=0, server_default="0")
+    sack_yards = Column(Float, nullable=False, default=0, server_default="0")
+    carries = Column(Integer, nullable=False, default=0, server_default="0")
+    rushing_yards = Column(Float, nullable=False, default=0, server_default="0")
+    rushing_tds = Column(Integer, nullable=False, default=0, server_default="0")
+    targets = Column(Integer, nullable=False, default=0, server_default="0")
+    receptions = Column(Integer, nullable=False, default=0, server_default="0")
+    receiving_yards = Column(Float, nullable=False, default=0, server_default="0")
+    receiving_tds = Column(Integer, nullable=False, default=0, server_default="0")
+    tackles = Column(Integer, nullable=False, default=0, server_default="0")
+    assists = Column(Integer, nullable=False, default=0, server_default="0")
+    combined_tackles = Column(Integer, nullable=False, default=0, server_default="0")
+    sacks_defense = Column(Float, nullable=False, default=0, server_default="0")
+    tackles_for_loss = Column(Float, nullable=False, default=0, server_default="0")
+    qb_hits = Column(Integer, nullable=False, default=0, server_default="0")
+    passes_defended = Column(Integer, nullable=False, default=0, server_default="0")
+    fumbles_forced = Column(Integer, nullable=False, default=0, server_default="0")
+    fumbles_recovered = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Indexes added by migrations/versions/0005_nfl_player_season_stats.py:
+    # the default sort stat of each leaderboard endpoint, within a season.
+    __table_args__ = (
+        Index("ix_nfl_player_season_stats_season_passing_yards", "season", "passing_yards"),
+        Index("ix_nfl_player_season_stats_season_rushing_yards", "season", "rushing_yards"),
+        Index("ix_nfl_player_season_stats_season_receiving_yards", "season", "receiving_yards"),
+        Index("ix_nfl_player_season_stats_season_combined_tackles", "season", "combined_tackles"),
+    )
+
+
+# The per-game stats nfl_player_season_stats totals.
+PLAYER_STAT_FIELDS = tuple(
+    column.name for column in NflPlayerGameStats.__table__.columns
+    if column.name not in ("player_id", "game_id", "team", "position")
+)
+# The NflPlayerGameStats attributes a stat line's contribution depends on.
+STAT_LINE_ATTRS = ("player_id", "game_id") + PLAYER_STAT_FIELDS
+
+
+def _add_stat_line(lines, values, sign=1):
+    player_id, game_id, *stats = values
+    if player_id is None or game_id is None:
+        return
+    delta = lines[(player_id, game_id)]
+    delta["games_played"] += sign
+    for field, value in zip(PLAYER_STAT_FIELDS, stats):
+        if value:
+            delta[field] += sign * value
+
+
+def _game_seasons(connection, game_ids):
+    games = NflGame.__table__
+    return dict(connection.execute(
+        select(games.c.game_id, games.c.season).where(games.c.game_id.in_(list(game_ids)))
+    ).all())
+
+
+def _lines_by_season(deltas, lines, seasons):
+    for (player_id, game_id), delta in lines.items():
+        season = seasons.get(game_id)
+        if season is None:
+            continue
+        for field, value in delta.items():
+            deltas[(season, player_id)][field] += value
+
+
+for _name in STAT_LINE_ATTRS:
+    event.listen(getattr(NflPlayerGameStats, _name), "set", _track_previous_value, active_history=True)
+
+
+def _moved_game_lines(deltas, connection, moved_games, old_lines):
+    # The stat lines of a game whose season changes move with it. Lines this
+    # flush rewrites are already in old_lines (and new_lines); the rest are
+    # read as the database holds them and moved from the old season to the new.
+    stats = NflPlayerGameStats.__table__
+    rows = connection.execute(
+        select(stats.c.player_id, stats.c.game_id, *(stats.c[field] for field in PLAYER_STAT_FIELDS))
+        .where(stats.c.game_id.in_(list(moved_games)))
+    )
+    for values in rows:
+        player_id, game_id = values[:2]
+        if (player_id, game_id) in old_lines:
+            continue
+        line = defaultdict(Counter)
+        _add_stat_line(line, values)
+        old_season, new_season = moved_games[game_id]
+        for field, value in line[(player_id, game_id)].items():
+            deltas[(old_season, player_id)][field] -= value
+            deltas[(new_season, player_id)][field] += value
+
+
+@event.listens_for(NflSession, "before_flush")
+def _collect_player_season_deltas(session, flush_context, instances):
+    old_lines, new_lines = defaultdict(Counter), defaultdict(Counter)
+    moved_games = {}
+    for instance in session.new:
+        if isinstance(instance, NflPlayerGameStats):
+            _add_stat_line(new_lines, _new_values(instance, STAT_LINE_ATTRS))
+    for instance in session.deleted:
+        if isinstance(instance, NflPlayerGameStats):
+            _add_stat_line(old_lines, _old_values(instance, STAT_LINE_ATTRS), -1)
+    for instance in session.dirty:
+        if not session.is_modified(instance):
+            continue
+        if isinstance(instance, NflPlayerGameStats):
+            _add_stat_line(old_lines, _old_values(instance, STAT_LINE_ATTRS), -1)
+            _add_stat_line(new_lines, _new_values(instance, STAT_LINE_ATTRS))
+        elif isinstance(instance, NflGame):
+            old_season = _old_values(instance, ("season",))[0]
+            if old_season != instance.season:
+                moved_games[instance.game_id] = (old_season, instance.season)
+
+    # A removed line is subtracted from the season its game had before this
+    # flush, which is what the database still holds now.
+    deltas = defaultdict(Counter)
+    if old_lines:
+        seasons = _game_seasons(session.connection(), {game_id for _, game_id in old_lines})
+        _lines_by_season(deltas, old_lines, seasons)
+    if moved_games:
+        _moved_game_lines(deltas, session.connection(), moved_games, old_lines)
+    session.info["player_season_stat_deltas"] = (deltas, new_lines)
+
+
+@event.listens_for(NflSession, "after_flush")
+def _apply_player_season_deltas(session, flush_context):
+    pending = session.info.pop("player_season_stat_deltas", None)
+    if not pending:
+        return
+    deltas, new_lines = pending
+    if not (deltas or new_lines):
+        return
+    connection = session.connection()
+    # Added lines count towards their game's season as of this flush.
+    if new_lines:
+        seasons = _game_seasons(connection, {game_id for _, game_id in new_lines})
+        _lines_by_season(deltas, new_lines, seasons)
+    _apply_deltas(connection, NflPlayerSeasonStats.__table__, ("season", "player_id"), deltas)
+
+
+def rebuild_player_season_stats(db, season=None) -> int:
+    """
+    Recomputes nfl_player_season_stats from nfl_player_game_stats (one season,
+    or all of them) with one INSERT ... SELECT, in the transaction of `db`
+    (a Session or Connection). Returns the number of rows written.
+    """
+    stats = NflPlayerGameStats.__table__
+    games = NflGame.__table__
+    rollup = NflPlayerSeasonStats.__table__
+    totals = (
+        select(
+            games.c.season, stats.c.player_id, func.count(),
+            *(func.coalesce(func.sum(stats.c[field]), 0) for field in PLAYER_STAT_FIELDS),
+        )
+        .select_from(stats.join(games, games.c.game_id == stats.c.game_id))
+        .group_by(games.c.season, stats.c.player_id)
+    )
+    delete = rollup.delete()
+    if season is not None:
+        totals = totals.where(games.c.season == season)
+        delete = delete.where(rollup.c.season == season)
+    db.execute(delete)
+    inserted = db.execute(
+        rollup.insert().from_select(["season", "player_id", "games_played", *PLAYER_STAT_FIELDS], totals)
+    )
+    return inserted.rowcount
+
+
+engine = None
+# Bound by init_engine(), which the app's lifespan hook calls at startup.
+SessionLocal = sessionmaker(class_=NflSession, autocommit=False, autoflush=False)
+
+def init_engine(database_url=None):
+    """
+    Creates the database engine and binds SessionLocal to it.
+    Deferred from import time so that importing the models stays cheap;
+    calling it again returns the existing engine.
+    """
+    global engine
+    if engine is None:
+        engine = instrument_engine(create_engine(database_url or DATABASE_URL))
+        SessionLocal.configure(bind=engine)
+    return engine
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def dispose_engine():
+    global engine
+    if engine is not None:
+        engine.dispose()
+        engine = None
 
 def get_db():
+    init_engine()
     db = SessionLocal()
     try:
         yield db
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Optional
 import nfl_crud, nfl_schemas, nfl_models # Changed to absolute import
 from nfl_models import get_db # Changed to absolute import
 
@@ -44,36 +45,43 @@ def read_nfl_schedule(
         schedule = nfl_crud.get_nfl_schedule(db, season=season)
     return {"games": schedule}
 
-@router.get("/nfl/players", response_model=List[nfl_schemas.NflPlayer])
+MAX_PLAYERS_PAGE_SIZE = 1000
+
+@router.get("/nfl/players", response_model=nfl_schemas.NflPlayersPage)
 def read_nfl_players(
-    season: str = Query("2024-2025", description="Season in YYYY-YYYY format"), 
+    season: Optional[str] = Query(None, pattern=r"^\d{4}(-\d{4})?$", description="Only players who played in this season (YYYY; YYYY-YYYY uses the first year)"),
+    team: Optional[str] = Query(None, description="Team abbreviation"),
+    position: Optional[str] = Query(None),
+    after: Optional[str] = Query(None, description="next_after from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PLAYERS_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated player fields to return; player_id is always included"),
     db: Session = Depends(get_db)
 ):
-    players = nfl_crud.get_nfl_players(db, season=season)
-    return players
+    selected = None
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in nfl_crud.PLAYER_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    page = nfl_crud.get_nfl_players(
+        db, season=season[:4] if season else None, team=team, position=position,
+        after=after, limit=limit, fields=selected,
+    )
+    # Rows come straight from the database; skip validating each one.
+    return JSONResponse(content=page)
 
 @router.get("/nfl/player/{player_id}", response_model=nfl_schemas.NflPlayerDetailsResponse)
-def read_nfl_player_details(player_id: str, db: Session = Depends(get_db)):
-    player_details = nfl_crud.get_nfl_player_details(db, player_id=player_id)
-    if player_details is None or player_details["player"] is None:
+def read_nfl_player_details(
+    player_id: str,
+    season: str = Query("2024", description="Season as a 4-digit year string"),
+    db: Session = Depends(get_db)
+):
+    player_details = nfl_crud.get_nfl_player_details(db, player_id=player_id, season=season)
+    if player_details is None:
         raise HTTPException(status_code=404, detail="Player not found")
-    
-    # Transform game_log to match the NflPlayerGameStatWithGame schema
-    transformed_game_log = []
-    if player_details.get("game_log"):
-        for stat, game in player_details["game_log"]:
-            transformed_game_log.append(
-                nfl_schemas.NflPlayerGameStatWithGame(
-                    **stat.__dict__, # Convert SQLAlchemy model to dict
-                    game=nfl_schemas.NflGameBase(**game.__dict__) # Convert SQLAlchemy model to dict
-                )
-            )
-    
-    return nfl_schemas.NflPlayerDetailsResponse(
-        player=player_details["player"],
-        stats=player_details["stats"],
-        game_log=transformed_game_log
-    )
+    # The crud dicts already match NflPlayerDetailsResponse (which still documents
+    # the endpoint); returning them directly skips a Pydantic model per game.
+    return JSONResponse(content=player_details)
 
 @router.get("/nfl/standings", response_model=nfl_schemas.NflStandingsResponse)
 def read_nfl_standings(
@@ -107,6 +115,8 @@ def nfl_scout_picks():
     # You can implement logic here later based on your NFL scouting criteria.
     return {"message": "NFL Scout Picks page is under construction."}
 
+MAX_LEADERS = 200
+
 @router.get("/nfl/players/leaders/passing", response_model=nfl_schemas.NflPassingLeadersResponse)
 def read_nfl_passing_leaders(
     season: str = Query("2024", description="Season as a 4-digit year string"),
@@ -125,4 +135,97 @@ def read_nfl_passing_leaders(
         )
         for leader in leaders_data
     ]
-    return {"leaders": formatted_leaders} 
\ No newline at end of file
+    return {"leaders": formatted_leaders} 
+
+@router.get("/nfl/players/leaders/rushing", response_model=nfl_schemas.NflRushingLeadersResponse)
+def read_nfl_rushing_leaders(
+    season: str = Query("2024", description="Season as a 4-digit year string"),
+    position: Optional[str] = Query(None, description="Only players at this position, e.g. RB"),
+    limit: int = Query(50, ge=1, le=MAX_LEADERS),
+    db: Session = Depends(get_db)
+):
+    leaders_data = nfl_crud.get_nfl_rushing_leaders(db, season=season, position=position, limit=limit)
+    formatted_leaders = [
+        nfl_schemas.NflRushingLeader(
+            player=leader.NflPlayer,
+            total_rushing_yards=int(leader.total_rushing_yards),
+            total_rushing_tds=leader.total_rushing_tds,
+            total_carries=leader.total_carries,
+            games_played=leader.games_played
+        )
+        for leader in leaders_data
+    ]
+    return {"leaders": formatted_leaders}
+
+@router.get("/nfl/players/leaders/receiving", response_model=nfl_schemas.NflReceivingLeadersResponse)
+def read_nfl_receiving_leaders(
+    season: str = Query("2024", description="Season as a 4-digit year string"),
+    position: Optional[str] = Query(None, description="Only players at this position, e.g. WR"),
+    limit: int = Query(50, ge=1, le=MAX_LEADERS),
+    db: Session = Depends(get_db)
+):
+    leaders_data = nfl_crud.get_nfl_receiving_leaders(db, season=season, position=position, limit=limit)
+    formatted_leaders = [
+        nfl_schemas.NflReceivingLeader(
+            player=leader.NflPlayer,
+            total_receiving_yards=int(leader.total_receiving_yards),
+            total_receiving_tds=leader.total_receiving_tds,
+            total_receptions=leader.total_receptions,
+            total_targets=leader.total_targets,
+            games_played=leader.games_played
+        )
+        for leader in leaders_data
+    ]
+    return {"leaders": formatted_leaders}
+
+@router.get("/nfl/players/leaders/defense", response_model=nfl_schemas.NflDefensiveLeadersResponse)
+def read_nfl_defensive_leaders(
+    season: str = Query("2024", description="Season as a 4-digit year string"),
+    position: Optional[str] = Query(None, description="Only players at this position, e.g. LB"),
+    limit: int = Query(50, ge=1, le=MAX_LEADERS),
+    db: Session = Depends(get_db)
+):
+    leaders_data = nfl_crud.get_nfl_defensive_leaders(db, season=season, position=position, limit=limit)
+    formatted_leaders = [
+        nfl_schemas.NflDefensiveLeader(
+            player=leader.NflPlayer,
+            total_combined_tackles=leader.total_combined_tackles,
+            total_tackles=leader.total_tackles,
+            total_assists=leader.total_assists,
+            total_sacks_defense=leader.total_sacks_defense,
+            total_tackles_for_loss=leader.total_tackles_for_loss,
+            total_passes_defended=leader.total_passes_defended,
+            total_fumbles_forced=leader.total_fumbles_forced,
+            games_played=leader.games_played
+        )
+        for leader in leaders_data
+    ]
+    return {"leaders": formatted_leaders}
+
+@router.get("/nfl/players/leaders", response_model=nfl_schemas.NflStatLeadersResponse)
+def read_nfl_stat_leaders(
+    stat: str = Query(..., description="Any per-game stat column, e.g. rushing_yards"),
+    season: str = Query("2024", description="Season as a 4-digit year string"),
+    aggregation: str = Query("sum", pattern="^(sum|per_game|rate)$", description="Season total, per game played, or per unit of `per`"),
+    per: Optional[str] = Query(None, description="Denominator stat of a rate, e.g. carries"),
+    qualify: Optional[str] = Query(None, description="Stat (or games_played) a player needs at least `min` of"),
+    min_qualify: float = Query(0, ge=0, alias="min"),
+    position: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_LEADERS),
+    db: Session = Depends(get_db)
+):
+    try:
+        leaders_data = nfl_crud.get_nfl_leaders(
+            db, stat, season=season, aggregation=aggregation, per=per,
+            qualify=qualify, min_qualify=min_qualify, position=position, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    formatted_leaders = [
+        nfl_schemas.NflStatLeader(
+            player=leader.NflPlayer,
+            **{name: value for name, value in leader._asdict().items() if name != "NflPlayer"}
+        )
+        for leader in leaders_data
+    ]
+    return {"leaders": formatted_leaders}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 # Base models for individual entities
 class NflTeamBase(BaseModel):
@@ -95,6 +95,12 @@ class NflGame(NflGameBase):
 class NflPlayerGameStats(NflPlayerGameStatsBase):
     pass    
 
+class NflPlayersPage(BaseModel):
+    # Each player has the requested fields (all NflPlayer fields by default).
+    players: List[Dict[str, Optional[str]]]
+    limit: int
+    next_after: Optional[str] = None
+
 class NflPlayerDetailStats(BaseModel):
     total_attempts: Optional[int] = None
     total_completions: Optional[int] = None
@@ -164,4 +170,51 @@ class NflPassingLeader(BaseModel):
     games_played: int
 
 class NflPassingLeadersResponse(BaseModel):
-    leaders: List[NflPassingLeader] 
\ No newline at end of file
+    leaders: List[NflPassingLeader] 
+
+class NflRushingLeader(BaseModel):
+    player: NflPlayer
+    total_rushing_yards: int
+    total_rushing_tds: int
+    total_carries: int
+    games_played: int
+
+class NflRushingLeadersResponse(BaseModel):
+    leaders: List[NflRushingLeader]
+
+class NflReceivingLeader(BaseModel):
+    player: NflPlayer
+    total_receiving_yards: int
+    total_receiving_tds: int
+    total_receptions: int
+    total_targets: int
+    games_played: int
+
+class NflReceivingLeadersResponse(BaseModel):
+    leaders: List[NflReceivingLeader]
+
+class NflDefensiveLeader(BaseModel):
+    player: NflPlayer
+    total_combined_tackles: int
+    total_tackles: int
+    total_assists: int
+    total_sacks_defense: float
+    total_tackles_for_loss: float
+    total_passes_defended: int
+    total_fumbles_forced: int
+    games_played: int
+
+class NflDefensiveLeadersResponse(BaseModel):
+    leaders: List[NflDefensiveLeader]
+
+class NflStatLeader(BaseModel):
+    # Also carries a total_<stat> field for each requested total.
+    player: NflPlayer
+    games_played: int
+    value: float
+
+    class Config:
+        extra = "allow"
+
+class NflStatLeadersResponse(BaseModel):
+    leaders: List[NflStatLeader]
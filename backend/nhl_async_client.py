@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from instrumentation import track_upstream
+
+API_WEB_BASE_URL = "https://api-web.nhle.com/v1/"
+MAX_CONCURRENT_REQUESTS = 8
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+class AsyncNHLClient:
+    """
+    Async access to the NHL web API over one pooled httpx.AsyncClient.
+    Connections are kept alive (HTTP/2 where the server supports it) and a
+    semaphore bounds how many requests are in flight at once.
+    """
+    def __init__(self, base_url: str = API_WEB_BASE_URL,
+                 max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS):
+        self._base_url = base_url
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                http2=True,
+                timeout=self._timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self._max_concurrency,
+                    max_keepalive_connections=self._max_concurrency,
+                    keepalive_expiry=30,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._client
+
+    async def get_json(self, resource: str) -> Any:
+        client = self._get_client()
+        async with self._semaphore:
+            with track_upstream("web." + resource.split("/", 1)[0]):
+                response = await client.get(resource)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_schedule(self, date: str) -> Dict[str, Any]:
+        """
+        Schedule for one YYYY-MM-DD date, in the same shape as
+        nhlpy's client.schedule.get_schedule(date=...).
+        """
+        date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        schedule_data = await self.get_json(f"schedule/{date}")
+        response_payload = {
+            "nextStartDate": schedule_data.get("nextStartDate"),
+            "previousStartDate": schedule_data.get("previousStartDate"),
+            "date": date,
+            "oddsPartners": schedule_data.get("oddsPartners"),
+        }
+        game_week = schedule_data.get("gameWeek", [])
+        matching_day = next((day for day in game_week if day.get("date") == date), None)
+        if matching_day:
+            games = matching_day.get("games", [])
+            response_payload["games"] = games
+            response_payload["numberOfGames"] = len(games)
+        return response_payload
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+nhl_async_client = AsyncNHLClient()
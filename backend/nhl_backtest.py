@@ -0,0 +1,252 @@
+"""
+Season-long backtest of the best-odds travel-fatigue criteria.
+
+A season of schedules and results is loaded once into per-game numpy
+columns. Every (lookback_days, travel_threshold, night_start_hour,
+require_back_to_back) combination is then evaluated in one vectorised pass.
+A pick is a game that best_odds_for_date would return; it is a hit when
+the away team lost.
+
+    python nhl_backtest.py --season 20242025 --lookbacks 2,3,4 \\
+        --thresholds 0:3000:100 --night-hours 17,18,19,20 --top 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from nhl_game_table import COLUMNS
+from nhl_schedule_cache import FINAL_GAME_STATES, schedule_cache
+from nhl_travel import SlidingTravelEngine
+
+logger = logging.getLogger(__name__)
+
+
+def season_bounds(season: str):
+    """
+    (first day, last day) searched for games of an NHL season such as "20242025":
+    October 1 through June 30, capped at yesterday.
+    """
+    start = date(int(season[:4]), 10, 1)
+    end = min(date(int(season[4:]), 6, 30), datetime.today().date() - timedelta(days=1))
+    return start, end
+
+
+class SeasonColumns:
+    """
+    One row per game, in the order best_odds_for_date visits them, sliced out of
+    each schedule day's GameTable. `travel[lookback]` holds the away team's
+    cumulative travel for that lookback, exactly as the live endpoints compute it.
+    """
+    def __init__(self, start_date, end_date, lookbacks: Sequence[int], cache=schedule_cache):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.lookbacks = sorted(set(lookbacks))
+        self.travel: Dict[int, np.ndarray] = {}
+        parts = []
+        for lookback in self.lookbacks:
+            travel = []
+            engine = SlidingTravelEngine(start_date, end_date, lookback_days=lookback, cache=cache)
+            for window in engine.windows():
+                table = window.target_table
+                rows = np.flatnonzero(table.has_teams())
+                away_teams = table.tolist("away_team")
+                travel.extend(window.travel_data.get(away_teams[row], 0) for row in rows.tolist())
+                if lookback == self.lookbacks[0]:
+                    away_yesterday = _away_teams(cache, window.target_date - timedelta(days=1))
+                    back_to_back = np.fromiter((away_teams[row] in away_yesterday for row in rows.tolist()),
+                                               dtype=bool, count=len(rows))
+                    parts.append((table, rows, back_to_back))
+            self.travel[lookback] = np.asarray(travel, dtype=np.float64)
+
+        def column(name):
+            if not parts:
+                return np.empty(0, dtype=COLUMNS[name])
+            return np.concatenate([table.columns[name][rows] for table, rows, _ in parts])
+
+        self.game_id = column("game_id")
+        self.game_date = column("schedule_day")
+        self.away_team = column("away_team")
+        self.home_team = column("home_team")
+        self.start_hour = (np.concatenate([table.local_hour()[rows] for table, rows, _ in parts])
+                           if parts else np.empty(0, dtype=np.int64))
+        self.back_to_back = np.concatenate([b2b for _, _, b2b in parts]) if parts else np.empty(0, dtype=bool)
+        away_score, home_score = column("away_score"), column("home_score")
+        self.completed = (np.isin(column("state"), list(FINAL_GAME_STATES))
+                          & ~np.isnan(away_score) & ~np.isnan(home_score))
+        self.away_lost = self.completed & (away_score < home_score)
+
+    def __len__(self):
+        return len(self.game_id)
+
+    def picks(self, lookback_days=3, travel_threshold=100, night_start_hour=18, require_back_to_back=True) -> np.ndarray:
+        """
+        Boolean mask of the games best_odds_for_date would return for these parameters.
+        """
+        mask = (self.travel[lookback_days] >= travel_threshold) & (self.start_hour >= night_start_hour)
+        if require_back_to_back:
+            mask &= self.back_to_back
+        return mask
+
+
+def _away_teams(cache, day):
+    try:
+        return cache.get_table(day).away_teams()
+    except Exception as e:
+        logger.warning("Error loading schedule for %s: %s", day, e)
+        return set()
+
+
+def evaluate_grid(travel: np.ndarray, start_hour: np.ndarray, eligible: np.ndarray, away_lost: np.ndarray,
+                  thresholds: np.ndarray, night_hours: np.ndarray):
+    """
+    (picks, hits) arrays of shape (len(thresholds), len(night_hours)) over the
+    `eligible` games. Each is a single matrix product of the per-threshold and
+    per-hour masks, so the cost does not grow with the number of combinations.
+    """
+    by_threshold = (travel[None, :] >= thresholds[:, None]).astype(np.float32)
+    by_hour = (start_hour[None, :] >= night_hours[:, None]) & eligible[None, :]
+    picks = by_threshold @ by_hour.T.astype(np.float32)
+    hits = by_threshold @ (by_hour & away_lost[None, :]).T.astype(np.float32)
+    return picks.round().astype(np.int64), hits.round().astype(np.int64)
+
+
+_worker_columns = None
+
+
+def _init_worker(columns):
+    global _worker_columns
+    _worker_columns = columns
+
+
+def _evaluate_task(task):
+    lookback, require_back_to_back, thresholds, night_hours = task
+    columns = _worker_columns
+    eligible = columns.completed & columns.back_to_back if require_back_to_back else columns.completed
+    picks, hits = evaluate_grid(columns.travel[lookback], columns.start_hour, eligible, columns.away_lost,
+                                thresholds, night_hours)
+    return task, picks, hits
+
+
+def sweep(columns: SeasonColumns, thresholds: Iterable[float], night_hours: Iterable[int],
+          back_to_back_options: Iterable[bool] = (True, False), lookbacks: Optional[Iterable[int]] = None,
+          workers: Optional[int] = None) -> List[Dict]:
+    """
+    Picks, hits and hit rate for every parameter combination over the season's
+    completed games. Threshold chunks are spread across a process pool;
+    workers=1 evaluates in-process.
+    """
+    thresholds = np.asarray(sorted(set(thresholds)), dtype=np.float64)
+    night_hours = np.asarray(sorted(set(night_hours)), dtype=np.int16)
+    lookbacks = sorted(set(lookbacks)) if lookbacks is not None else columns.lookbacks
+    workers = workers or os.cpu_count() or 1
+    chunks = [chunk for chunk in np.array_split(thresholds, workers) if len(chunk)] or [thresholds]
+    tasks = [
+        (lookback, require_back_to_back, chunk, night_hours)
+        for lookback in lookbacks
+        for require_back_to_back in back_to_back_options
+        for chunk in chunks
+    ]
+
+    if workers == 1:
+        _init_worker(columns)
+        results = [_evaluate_task(task) for task in tasks]
+    else:
+        # spawn, not fork, so this is also safe to call from the multi-threaded server.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(columns,)) as pool:
+            results = list(pool.map(_evaluate_task, tasks))
+
+    rows = []
+    for (lookback, require_back_to_back, chunk, hours), picks, hits in results:
+        for i, threshold in enumerate(chunk):
+            for j, hour in enumerate(hours):
+                n_picks = int(picks[i, j])
+                rows.append({
+                    "lookback_days": lookback,
+                    "travel_threshold": float(threshold),
+                    "night_start_hour": int(hour),
+                    "require_back_to_back": require_back_to_back,
+                    "picks": n_picks,
+                    "hits": int(hits[i, j]),
+                    "hit_rate": round(int(hits[i, j]) / n_picks, 4) if n_picks else None,
+                })
+    return rows
+
+
+def load_season(start_date, end_date, lookbacks: Sequence[int], cache=schedule_cache) -> SeasonColumns:
+    """
+    Fetches every schedule day of the range concurrently (past days are
+    served from the snapshot store when available) and builds the columns.
+    """
+    first_day = start_date - timedelta(days=max(lookbacks) + 1)
+    days = [first_day + timedelta(days=i) for i in range((end_date - first_day).days + 1)]
+    asyncio.run(cache.prefetch(days))
+    return SeasonColumns(start_date, end_date, lookbacks, cache=cache)
+
+
+def _parse_values(spec: str, cast=float) -> List:
+    """
+    "17,18,19" or an inclusive range "start:stop:step".
+    """
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        return [cast(v) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(v) for v in spec.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", default="20242025")
+    parser.add_argument("--start", type=date.fromisoformat, help="first target date (default: season start)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last target date (default: season end)")
+    parser.add_argument("--lookbacks", default="3", help="lookback_days values, e.g. 2,3,4")
+    parser.add_argument("--thresholds", default="0:3000:100", help="travel thresholds in km")
+    parser.add_argument("--night-hours", default="17,18,19,20")
+    parser.add_argument("--back-to-back", choices=("both", "yes", "no"), default="both")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--min-picks", type=int, default=20, help="hide combinations with fewer picks")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print every row as JSON")
+    args = parser.parse_args()
+
+    start, end = season_bounds(args.season)
+    start, end = args.start or start, args.end or end
+    lookbacks = _parse_values(args.lookbacks, int)
+    back_to_back = {"both": (True, False), "yes": (True,), "no": (False,)}[args.back_to_back]
+
+    load_start = time.perf_counter()
+    columns = load_season(start, end, lookbacks)
+    load_seconds = time.perf_counter() - load_start
+    sweep_start = time.perf_counter()
+    rows = sweep(columns, _parse_values(args.thresholds), _parse_values(args.night_hours, int),
+                 back_to_back, lookbacks, args.workers)
+    sweep_seconds = time.perf_counter() - sweep_start
+
+    if args.json:
+        print(json.dumps(rows))
+        return 0
+    completed = int(columns.completed.sum())
+    base_rate = columns.away_lost.sum() / completed if completed else 0
+    print(f"{start} .. {end}: {len(columns)} games, {completed} completed, "
+          f"away teams lost {base_rate:.1%} overall")
+    print(f"loaded in {load_seconds:.2f}s, swept {len(rows)} combinations in {sweep_seconds:.2f}s")
+    ranked = sorted((r for r in rows if r["picks"] >= args.min_picks), key=lambda r: r["hit_rate"], reverse=True)
+    print(f"\n{'lookback':>8} {'travel>=':>9} {'hour>=':>6} {'b2b':>5} {'picks':>6} {'hits':>5} {'rate':>6}")
+    for r in ranked[:args.top]:
+        print(f"{r['lookback_days']:>8} {r['travel_threshold']:>9.0f} {r['night_start_hour']:>6} "
+              f"{str(r['require_back_to_back']):>5} {r['picks']:>6} {r['hits']:>5} {r['hit_rate']:>6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
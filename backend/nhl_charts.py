@@ -0,0 +1,73 @@
+import hashlib
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence, Tuple
+
+from chart_worker import render_bar_chart
+from ttl_cache import TTLCache, register_cache
+
+CHART_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+CHART_RENDER_WORKERS = 2
+CHART_CACHE_SIZE = 64
+
+
+class ChartService:
+    """
+    Renders charts in a process pool and caches the output by a content hash of
+    the chart's inputs. The hash doubles as the response ETag.
+    Concurrent requests for the same chart wait on one render.
+    """
+    def __init__(self, max_workers: int = CHART_RENDER_WORKERS, cache_size: int = CHART_CACHE_SIZE):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache = register_cache(TTLCache(self._render, maxsize=cache_size, name="charts"))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the server process is multi-threaded.
+                # The workers only import chart_worker to run render_bar_chart.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _render(self, items: Sequence[Tuple[str, float]], xlabel: str, ylabel: str, title: str,
+                fmt: str) -> bytes:
+        labels = [label for label, _ in items]
+        values = [value for _, value in items]
+        return self._get_pool().submit(render_bar_chart, labels, values, xlabel, ylabel, title, fmt).result()
+
+    @staticmethod
+    def etag(items: Sequence[Tuple[str, float]], xlabel: str, ylabel: str, title: str, fmt: str = "png") -> str:
+        """
+        Content hash of a bar chart's inputs, usable as an HTTP ETag.
+        Computing it does not render anything.
+        """
+        payload = json.dumps([list(items), xlabel, ylabel, title, fmt], default=str)
+        return f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+    def bar_chart(self, items: Sequence[Tuple[str, float]], xlabel: str, ylabel: str, title: str,
+                  fmt: str = "png") -> bytes:
+        """
+        Image bytes for a bar chart of `items` (label, value) pairs, rendered
+        off-thread in the process pool unless an identical chart is cached.
+        """
+        etag = self.etag(items, xlabel, ylabel, title, fmt)
+        return self._cache.get(etag, items, xlabel, ylabel, title, fmt)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+chart_service = ChartService()
@@ -0,0 +1,24 @@
+import threading
+
+from instrumentation import InstrumentedNHLClient
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def nhl_client(verbose: bool = False):
+    """
+    Shared nhlpy NHLClient, one per `verbose` setting.
+    nhlpy is imported on first use instead of at startup. The client opens a
+    fresh connection per request and keeps no other state, so threads can share it.
+    Every call through it is counted as an upstream call (see instrumentation).
+    """
+    client = _clients.get(verbose)
+    if client is None:
+        with _lock:
+            client = _clients.get(verbose)
+            if client is None:
+                from nhlpy.nhl_client import NHLClient
+                client = InstrumentedNHLClient(NHLClient(verbose=verbose))
+                _clients[verbose] = client
+    return client
@@ -0,0 +1,143 @@
+import math
+import threading
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+# A reported coordinate this close to a point already in the matrix shares
+# its row: payloads report the same arena with slightly different coordinates.
+SNAP_TOLERANCE_KM = 0.5
+# Reported coordinates tracked beyond the venue list, snapped or given their
+# own row. Coordinates seen after that use the scalar haversine.
+MAX_EXTRA_POINTS = 64
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = EARTH_RADIUS_KM  # Earth's radius in km
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+    a = math.sin(delta_phi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def pairwise_haversine(points):
+    """
+    Vectorised great-circle distances (km) between every pair of (lat, lon) points.
+    Returns an N x N array.
+    """
+    coords = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lat = coords[:, 0][:, None]
+    lon = coords[:, 1][:, None]
+    delta_phi = lat.T - lat
+    delta_lambda = lon.T - lon
+    a = np.sin(delta_phi / 2)**2 + np.cos(lat) * np.cos(lat.T) * np.sin(delta_lambda / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_to(point, points):
+    """
+    Vectorised great-circle distances (km) from one (lat, lon) point to each of `points`.
+    """
+    lat1, lon1 = np.radians(point)
+    coords = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    lat2 = coords[:, 0]
+    delta_phi = lat2 - lat1
+    delta_lambda = coords[:, 1] - lon1
+    a = np.sin(delta_phi / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lambda / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+class DistanceMatrix:
+    """
+    Precomputed arena-to-arena distances.
+    Lookups by coordinate pair or venue name pair are O(1); coordinates that
+    are not in the matrix fall back to computing the haversine on the fly.
+    Reported coordinates within SNAP_TOLERANCE_KM of a known point are
+    aliased to its row and the others get a row of their own, for at most
+    MAX_EXTRA_POINTS coordinates, so the matrix stays bounded however many
+    coordinates are seen.
+    """
+    def __init__(self, venue_coords):
+        self._lock = threading.Lock()
+        self._venue_index = {}
+        self._state = ({}, [])  # ((lat, lon) -> row index, rows)
+        self._points = []
+        self._aliases = {}  # reported (lat, lon) -> the known point it snapped to
+        self._extra_points = 0
+        self.add_venues(venue_coords)
+
+    def _rebuild(self, points):
+        rows = pairwise_haversine(points).tolist() if points else []
+        index = {point: i for i, point in enumerate(points)}
+        index.update((alias, index[point]) for alias, point in self._aliases.items())
+        # Readers take a single reference, so swapping the tuple is atomic for them.
+        self._state = (index, rows)
+
+    def add_venues(self, venue_coords):
+        with self._lock:
+            points = list(self._points)
+            for name, (lat, lon) in venue_coords.items():
+                point = (lat, lon)
+                if point not in points:
+                    points.append(point)
+                self._venue_index[name] = point
+            if points != self._points:
+                self._points = points
+                self._rebuild(points)
+
+    def add_coordinates(self, coordinates):
+        """
+        Adds (lat, lon) points seen in schedule `venue.location` payloads.
+        A point near a known one is snapped to it and the others get their own
+        row, until MAX_EXTRA_POINTS are tracked; later ones are ignored.
+        """
+        if self._extra_points >= MAX_EXTRA_POINTS:
+            return
+        index = self._state[0]
+        new_points = [tuple(p) for p in coordinates if tuple(p) not in index]
+        if not new_points:
+            return
+        with self._lock:
+            points = list(self._points)
+            aliases = dict(self._aliases)
+            for point in new_points:
+                if point in aliases or point in points or self._extra_points >= MAX_EXTRA_POINTS:
+                    continue
+                self._extra_points += 1
+                if points:
+                    distances = haversine_to(point, points)
+                    nearest = int(distances.argmin())
+                    if distances[nearest] <= SNAP_TOLERANCE_KM:
+                        aliases[point] = points[nearest]
+                        continue
+                points.append(point)
+            if points != self._points or aliases != self._aliases:
+                self._points = points
+                self._aliases = aliases
+                self._rebuild(points)
+
+    def distance(self, lat1, lon1, lat2, lon2):
+        index, rows = self._state
+        i = index.get((lat1, lon1))
+        j = index.get((lat2, lon2))
+        if i is None or j is None:
+            return haversine(lat1, lon1, lat2, lon2)
+        return rows[i][j]
+
+    def between_venues(self, venue_a, venue_b):
+        """
+        Distance between two named venues, or None if either is unknown.
+        """
+        a = self._venue_index.get(venue_a)
+        b = self._venue_index.get(venue_b)
+        if a is None or b is None:
+            return None
+        return self.distance(a[0], a[1], b[0], b[1])
+
+    def __len__(self):
+        return len(self._points)
@@ -0,0 +1,248 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nhl_time import to_local, utc_offsets, venue_timezone
+from nhl_venues import venue_coords
+
+# Column name -> numpy dtype. Object columns hold strings (or None when the payload lacks them).
+COLUMNS = {
+    "game_id": object,
+    "schedule_day": "datetime64[D]",   # the schedule date the game was listed under
+    "game_date": "datetime64[D]",      # date of startTimeUTC as given; NaT if it could not be parsed
+    "start_utc": "datetime64[s]",
+    "venue_tz": object,                # arena's IANA zone (see nhl_time.venue_timezone)
+    "utc_offset_minutes": np.int16,    # arena's UTC offset at the start, 0 when start_utc is NaT
+    "local_start": "datetime64[m]",    # arena-local wall-clock start; NaT if start_utc is
+    "home_team": object,
+    "away_team": object,
+    "home_id": np.int32,               # NHL team ids, -1 when absent
+    "away_id": np.int32,
+    "home_conference": object,
+    "away_conference": object,
+    "home_score": np.float64,          # NaN until the game has a score
+    "away_score": np.float64,
+    "venue": object,
+    "venue_lat": np.float64,           # from the payload's location, else the venue table; NaN if unknown
+    "venue_lon": np.float64,
+    "state": object,
+    "broadcast": object,
+}
+
+
+def _team_field(team: Dict[str, Any], *path):
+    value = team
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _team_id(team: Dict[str, Any]) -> int:
+    team_id = team.get("id")
+    return team_id if isinstance(team_id, int) else -1
+
+
+def _score(team: Dict[str, Any]) -> float:
+    score = team.get("score")
+    return float(score) if isinstance(score, (int, float)) else float("nan")
+
+
+# Filled in batch per table from start_utc and venue_tz rather than parsed per row.
+_ARENA_TIME_COLUMNS = ("utc_offset_minutes", "local_start")
+_ROW_COLUMNS = [(name, dtype) for name, dtype in COLUMNS.items() if name not in _ARENA_TIME_COLUMNS]
+
+
+def _parse_row(game: Dict[str, Any], schedule_day) -> Tuple[Tuple, Optional[Tuple[float, float]]]:
+    """
+    One table row for `game`, plus the payload-reported venue location if there is one.
+    """
+    start_utc = game_date = None
+    try:
+        start = datetime.fromisoformat(game["startTimeUTC"].replace("Z", "+00:00"))
+        game_date = start.date()
+        start_utc = start.astimezone(timezone.utc).replace(tzinfo=None) if start.tzinfo else start
+    except Exception:
+        pass
+
+    location = None
+    lat = lon = float("nan")
+    venue = game.get("venue")
+    venue_name = venue.get("default") if isinstance(venue, dict) else None
+    if isinstance(venue, dict) and "location" in venue:
+        try:
+            lat, lon = venue["location"]["lat"], venue["location"]["lon"]
+            location = (lat, lon)
+        except (KeyError, TypeError):
+            lat = lon = float("nan")
+    elif venue_name in venue_coords:
+        lat, lon = venue_coords[venue_name]
+
+    home = game.get("homeTeam") if isinstance(game.get("homeTeam"), dict) else {}
+    away = game.get("awayTeam") if isinstance(game.get("awayTeam"), dict) else {}
+    broadcasters = game.get("broadcasters") or []
+    broadcast = None
+    if broadcasters and isinstance(broadcasters[0], dict):
+        broadcast = broadcasters[0].get("name")
+
+    row = (
+        game.get("id"),
+        schedule_day,
+        game_date,
+        start_utc,
+        venue_timezone(venue_name, game.get("venueTimezone")),
+        _team_field(home, "commonName", "default"),
+        _team_field(away, "commonName", "default"),
+        _team_id(home),
+        _team_id(away),
+        _team_field(home, "conference", "name"),
+        _team_field(away, "conference", "name"),
+        _score(home),
+        _score(away),
+        venue_name,
+        lat,
+        lon,
+        game.get("gameState"),
+        broadcast,
+    )
+    return row, location
+
+
+class GameTable:
+    """
+    Schedule games as parallel numpy columns (see COLUMNS), parsed once at ingest.
+
+    - `by_day` maps each schedule day to the slice of its rows.
+    - `by_team` maps each team name to its (row, is_home) appearances in row order.
+    - `locations` holds the venue coordinates reported by the payloads themselves.
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], locations=frozenset(), source=None):
+        self.columns = columns
+        for name, values in columns.items():
+            setattr(self, name, values)
+        self.locations = frozenset(locations)
+        self.source = source
+        self._lists: Dict[str, list] = {}
+        self._derived: Dict[str, Any] = {}
+
+        self.by_day: Dict[Any, slice] = {}
+        days = self.schedule_day.tolist()
+        start = 0
+        for i in range(1, len(days) + 1):
+            if i == len(days) or days[i] != days[start]:
+                if days:
+                    self.by_day[days[start]] = slice(start, i)
+                start = i
+
+        self.by_team: Dict[str, List[Tuple[int, bool]]] = {}
+        for row, (home, away) in enumerate(zip(self.home_team.tolist(), self.away_team.tolist())):
+            if home is not None:
+                self.by_team.setdefault(home, []).append((row, True))
+            if away is not None:
+                self.by_team.setdefault(away, []).append((row, False))
+
+    def __len__(self):
+        return len(self.game_id)
+
+    @classmethod
+    def from_games(cls, games: Iterable[Dict[str, Any]], schedule_day=None, source=None) -> "GameTable":
+        rows = []
+        locations = set()
+        for game in games:
+            row, location = _parse_row(game, schedule_day)
+            rows.append(row)
+            if location is not None:
+                locations.add(location)
+        columns = {}
+        for position, (name, dtype) in enumerate(_ROW_COLUMNS):
+            values = [row[position] for row in rows]
+            if dtype is object:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            elif isinstance(dtype, str):
+                column = np.array([np.datetime64("NaT") if v is None else v for v in values], dtype=dtype)
+            else:
+                column = np.array(values, dtype=dtype)
+            columns[name] = column
+        offsets = utc_offsets(columns["start_utc"], columns["venue_tz"])
+        columns["utc_offset_minutes"] = offsets
+        columns["local_start"] = to_local(columns["start_utc"], columns["venue_tz"], offsets)
+        columns = {name: columns[name] for name in COLUMNS}
+        return cls(columns, locations, source)
+
+    @classmethod
+    def from_payload(cls, schedule_day, payload: Dict[str, Any]) -> "GameTable":
+        """
+        Table of one schedule day's payload (as returned by the schedule endpoint).
+        """
+        return cls.from_games(payload.get("games", []), schedule_day, source=payload)
+
+    @classmethod
+    def empty(cls, schedule_day=None) -> "GameTable":
+        return cls.from_games([], schedule_day)
+
+    @classmethod
+    def concat(cls, tables: Sequence["GameTable"]) -> "GameTable":
+        """
+        One table with the rows of `tables` in order, e.g. a lookback window or a season.
+        """
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+        columns = {name: np.concatenate([t.columns[name] for t in tables]) for name in COLUMNS}
+        return cls(columns, frozenset().union(*(t.locations for t in tables)))
+
+    def day(self, schedule_day) -> "GameTable":
+        rows = self.by_day.get(schedule_day)
+        if rows is None:
+            return GameTable.empty(schedule_day)
+        if rows == slice(0, len(self)):
+            return self
+        return GameTable({name: column[rows] for name, column in self.columns.items()}, self.locations)
+
+    def tolist(self, name: str) -> list:
+        """
+        Column `name` as a list of Python values (dates, datetimes, floats, None),
+        converted once and reused.
+        """
+        values = self._lists.get(name)
+        if values is None:
+            values = self.columns[name].tolist()
+            self._lists[name] = values
+        return values
+
+    def derived(self, name: str, build: Callable[["GameTable"], Any]) -> Any:
+        """
+        `build(self)`, computed on first use and memoised; tables never change
+        after construction, so anything derived from them can be reused.
+        """
+        value = self._derived.get(name)
+        if value is None:
+            value = build(self)
+            self._derived[name] = value
+        return value
+
+    def away_teams(self) -> frozenset:
+        return self.derived("away_teams", lambda t: frozenset(a for a in t.tolist("away_team") if a is not None))
+
+    def has_teams(self) -> np.ndarray:
+        """
+        Rows with both team names, the rows every matchup builder reports.
+        """
+        return self.derived("has_teams", lambda t: np.fromiter(
+            (h is not None and a is not None for h, a in zip(t.tolist("home_team"), t.tolist("away_team"))),
+            dtype=bool, count=len(t),
+        ))
+
+    def local_hour(self) -> np.ndarray:
+        """
+        Arena-local start hour per row, -1 where local_start is NaT.
+        """
+        def build(t):
+            hours = (t.local_start.astype("datetime64[h]") - t.local_start.astype("datetime64[D]")).astype(np.int64)
+            return np.where(np.isnat(t.local_start), -1, hours)
+        return self.derived("local_hour", build)
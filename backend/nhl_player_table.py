@@ -0,0 +1,91 @@
+import re
+import threading
+import unicodedata
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """
+    Accent-, case- and punctuation-insensitive form of a player name,
+    e.g. "Tim Stützle" and "tim stutzle" both become "tim stutzle".
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    ascii_name = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", ascii_name.lower()).split())
+
+
+class JoinedPlayer(NamedTuple):
+    player: MappingProxyType
+    stats: Optional[MappingProxyType]
+
+
+class PlayerTable:
+    """
+    Read-only join of one season's roster with its skater stats.
+    Rows are matched on NHL player id, falling back to the normalised full name.
+    Neither the rows nor the source payloads are ever mutated, so the table can
+    be shared across requests.
+    """
+    def __init__(self, season: str, players: List[Dict[str, Any]], skater_stats: List[Dict[str, Any]]):
+        self.season = season
+        self.sources = (players, skater_stats)
+        stats_by_id = {}
+        stats_by_name = {}
+        for row in skater_stats:
+            if row.get("playerId") is not None:
+                stats_by_id[row["playerId"]] = row
+            name = normalize_name(row.get("skaterFullName", ""))
+            if name:
+                stats_by_name[name] = row
+
+        rows = []
+        by_id = {}
+        by_category: Dict[str, list] = {}
+        for p in players:
+            stats = stats_by_id.get(p.get("id"))
+            if stats is None:
+                stats = stats_by_name.get(normalize_name(p.get("fullName", "")))
+            joined = JoinedPlayer(
+                player=MappingProxyType(dict(p)),
+                stats=MappingProxyType(dict(stats)) if stats is not None else None,
+            )
+            rows.append(joined)
+            if p.get("id") is not None:
+                by_id[p["id"]] = joined
+            by_category.setdefault(p.get("category"), []).append(joined)
+
+        self.rows: Tuple[JoinedPlayer, ...] = tuple(rows)
+        self.by_id = MappingProxyType(by_id)
+        self.by_category = MappingProxyType({k: tuple(v) for k, v in by_category.items()})
+
+    def category(self, *categories: str) -> Tuple[JoinedPlayer, ...]:
+        if len(categories) == 1:
+            return self.by_category.get(categories[0], ())
+        return tuple(row for row in self.rows if row.player.get("category") in categories)
+
+
+class PlayerTableCache:
+    """
+    Keeps one PlayerTable per season and rebuilds it only when either cached
+    source (roster or skater stats) hands back a new object.
+    """
+    def __init__(self, players_loader: Callable[[str], List[Dict[str, Any]]],
+                 stats_loader: Callable[[str], List[Dict[str, Any]]]):
+        self._players_loader = players_loader
+        self._stats_loader = stats_loader
+        self._tables: Dict[str, PlayerTable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, season: str) -> PlayerTable:
+        players = self._players_loader(season)
+        skater_stats = self._stats_loader(season)
+        table = self._tables.get(season)
+        if table is not None and table.sources[0] is players and table.sources[1] is skater_stats:
+            return table
+        with self._lock:
+            table = self._tables.get(season)
+            if table is None or table.sources[0] is not players or table.sources[1] is not skater_stats:
+                table = PlayerTable(season, players, skater_stats)
+                self._tables[season] = table
+        return table
@@ -0,0 +1,175 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from nhl_schedule_cache import schedule_cache
+
+logger = logging.getLogger(__name__)
+
+# Cadences in seconds, overridable per deployment through the environment.
+PREFETCH_ENABLED = os.getenv("NHL_PREFETCH_ENABLED", "1") != "0"
+SCHEDULE_REFRESH_SECONDS = float(os.getenv("NHL_PREFETCH_SCHEDULE_SECONDS", 240))
+LIVE_SCHEDULE_REFRESH_SECONDS = float(os.getenv("NHL_PREFETCH_LIVE_SECONDS", 30))
+ROSTER_REFRESH_SECONDS = float(os.getenv("NHL_PREFETCH_ROSTER_SECONDS", 2 * 60 * 60))
+STATS_REFRESH_SECONDS = float(os.getenv("NHL_PREFETCH_STATS_SECONDS", 30 * 60))
+# Season the player jobs keep warm, such as "20242025"; unset follows the calendar.
+PREFETCH_SEASON = os.getenv("NHL_PREFETCH_SEASON", "")
+# A failed run is retried after this long instead of waiting a full interval.
+RETRY_SECONDS = 60
+
+PREFETCH_DAYS_AHEAD = 7
+# Past days the travel endpoints read; they never change, so they are fetched once.
+PREFETCH_DAYS_BEHIND = 3
+LIVE_GAME_STATES = {"PRE", "LIVE", "CRIT"}
+
+
+def prefetch_season(today: Optional[date] = None) -> str:
+    """
+    The season the player jobs keep warm: NHL_PREFETCH_SEASON if set, otherwise
+    the latest season to have started. Seasons start on October 1 (as in
+    nhl_backtest.season_bounds), so over the summer the one that just ended is kept.
+    """
+    if PREFETCH_SEASON:
+        return PREFETCH_SEASON
+    today = today or datetime.today().date()
+    first_year = today.year if today.month >= 10 else today.year - 1
+    return f"{first_year}{first_year + 1}"
+
+class PrefetchJob:
+    """
+    One periodic refresh. `run` is a coroutine function or a plain function
+    (run in a worker thread); `interval` is seconds or a callable returning
+    seconds, which lets a job speed up while games are live.
+    """
+    def __init__(self, name: str, run: Callable[[], Any], interval: Union[float, Callable[[], float]]):
+        self.name = name
+        self.run = run
+        self.interval = interval
+        self.runs = 0
+        self.failures = 0
+        self.last_started: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[float] = None
+
+    def interval_seconds(self) -> float:
+        return self.interval() if callable(self.interval) else self.interval
+
+    async def run_once(self):
+        self.last_started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(self.run):
+                await self.run()
+            else:
+                await asyncio.to_thread(self.run)
+            self.last_error = None
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Prefetch job %s failed: %s", self.name, e)
+        finally:
+            self.runs += 1
+            self.last_duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    def status(self) -> Dict[str, Any]:
+        next_run_in = None
+        if self.next_run_at is not None:
+            next_run_in = round(max(0.0, self.next_run_at - time.monotonic()), 1)
+        return {
+            "name": self.name,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started": self.last_started,
+            "last_duration_ms": self.last_duration_ms,
+            "last_ok": self.runs > 0 and self.last_error is None,
+            "last_error": self.last_error,
+            "interval_seconds": self.interval_seconds(),
+            "next_run_in_seconds": next_run_in,
+        }
+
+
+class Prefetcher:
+    """
+    Keeps caches warm in the background so request handlers only read them.
+    Each job loops in its own asyncio task: it runs immediately on start(),
+    then again after its interval. A job never overlaps with itself, and a
+    failed run is logged and retried rather than stopping the loop.
+    """
+    def __init__(self):
+        self.jobs: Dict[str, PrefetchJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, run: Callable[[], Any], interval: Union[float, Callable[[], float]]) -> PrefetchJob:
+        job = PrefetchJob(name, run, interval)
+        self.jobs[name] = job
+        return job
+
+    async def _loop(self, job: PrefetchJob):
+        while True:
+            await job.run_once()
+            delay = job.interval_seconds()
+            if job.last_error is not None:
+                delay = min(delay, RETRY_SECONDS)
+            job.next_run_at = time.monotonic() + delay
+            await asyncio.sleep(delay)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._loop(job), name=f"prefetch-{job.name}")
+            for job in self.jobs.values()
+        ]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "jobs": [job.status() for job in self.jobs.values()],
+        }
+
+
+def games_live(day=None) -> bool:
+    """
+    Whether any cached game on `day` (default today) is about to start or in progress.
+    """
+    day = day or datetime.today().date()
+    return any(game.get("gameState") in LIVE_GAME_STATES for game in schedule_cache.peek_games(day))
+
+
+def today_schedule_interval() -> float:
+    return LIVE_SCHEDULE_REFRESH_SECONDS if games_live() else SCHEDULE_REFRESH_SECONDS
+
+
+async def _gather_raising(coroutines):
+    # Let every fetch finish (successes are still cached), then surface the first failure.
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+async def refresh_today_schedule():
+    await schedule_cache.arefresh(datetime.today().date())
+
+
+async def refresh_upcoming_schedules():
+    today = datetime.today().date()
+    await _gather_raising(
+        [schedule_cache.aget_schedule(today - timedelta(days=d)) for d in range(1, PREFETCH_DAYS_BEHIND + 1)]
+        + [schedule_cache.arefresh(today + timedelta(days=d)) for d in range(1, PREFETCH_DAYS_AHEAD + 1)]
+    )
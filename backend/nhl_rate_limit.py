@@ -0,0 +1,87 @@
+import random
+import threading
+import time
+
+import httpx
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that adapts its refill rate to the upstream.
+    Each throttled response halves the rate (down to `min_rate`); each success
+    nudges it back up towards `max_rate`.
+    """
+    def __init__(self, rate: float, capacity: int, min_rate: float = 0.5, recovery_step: float = 0.25):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.capacity = capacity
+        self.recovery_step = recovery_step
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self):
+        """
+        Blocks until a token is available.
+        """
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+
+
+def _status_code(error: Exception):
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    # nhlpy's NHLApiException and subclasses; checked by attribute so nhlpy stays unimported.
+    return getattr(error, "status_code", None)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    429s, 5xx responses and transport errors are worth retrying; anything else is not.
+    """
+    status_code = _status_code(error)
+    if status_code is not None:
+        return status_code == 429 or 500 <= status_code < 600
+    return isinstance(error, httpx.TransportError)
+
+
+def call_with_backoff(fn, limiter: TokenBucket = None, max_attempts: int = 4, base_delay: float = 0.5):
+    """
+    Calls `fn()` under `limiter`, retrying retryable errors with exponential
+    backoff plus jitter. The last error is raised once attempts run out.
+    """
+    for attempt in range(max_attempts):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fn()
+        except Exception as e:
+            if not is_retryable(e) or attempt == max_attempts - 1:
+                raise
+            if limiter is not None and _status_code(e) == 429:
+                limiter.on_throttle()
+            time.sleep(base_delay * 2 ** attempt + random.uniform(0, base_delay))
+            continue
+        if limiter is not None:
+            limiter.on_success()
+        return result
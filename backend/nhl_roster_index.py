@@ -0,0 +1,62 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List
+
+ROSTER_CATEGORIES = ("forwards", "defensemen", "goalies")
+
+
+def _render_json(content) -> bytes:
+    # Same encoding as fastapi.responses.JSONResponse.
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class RosterIndex:
+    """
+    One season's player set partitioned by category.
+    Each category's response body is serialised once at build time.
+    """
+    def __init__(self, season: str, players: List[Dict[str, Any]]):
+        self.season = season
+        self.source = players
+        self.by_category = {category: [] for category in ROSTER_CATEGORIES}
+        for p in players:
+            self.by_category.setdefault(p.get("category"), []).append(p)
+        self._bodies = {
+            category: _render_json({category: players_in_category})
+            for category, players_in_category in self.by_category.items()
+        }
+
+    def players(self, category: str) -> List[Dict[str, Any]]:
+        return self.by_category.get(category, [])
+
+    def body(self, category: str) -> bytes:
+        """
+        Pre-serialised `{"<category>": [...]}` JSON body.
+        """
+        body = self._bodies.get(category)
+        if body is None:
+            body = _render_json({category: []})
+        return body
+
+
+class RosterIndexCache:
+    """
+    Keeps one RosterIndex per season on top of a cached player loader and
+    rebuilds it only when the loader hands back a different player list.
+    """
+    def __init__(self, loader: Callable[[str], List[Dict[str, Any]]]):
+        self._loader = loader
+        self._indexes: Dict[str, RosterIndex] = {}
+        self._lock = threading.Lock()
+
+    def get(self, season: str) -> RosterIndex:
+        players = self._loader(season)
+        index = self._indexes.get(season)
+        if index is not None and index.source is players:
+            return index
+        with self._lock:
+            index = self._indexes.get(season)
+            if index is None or index.source is not players:
+                index = RosterIndex(season, players)
+                self._indexes[season] = index
+        return index
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from nhl_async_client import nhl_async_client
+from nhl_client import nhl_client
+from nhl_game_table import GameTable
+from nhl_snapshots import afetch_with_snapshot, fetch_with_snapshot
+from ttl_cache import TTLCache, register_cache
+
+# Today's and future schedules still change (scores, game state, postponements),
+# so they are only trusted for a short while. A past date whose games are all
+# over never changes; one that still had live or upcoming games when fetched
+# (a late game fetched just after midnight) expires like a current one.
+CURRENT_SCHEDULE_TTL_SECONDS = 300
+# An expired current schedule is still served for this long while it refreshes in the background.
+CURRENT_SCHEDULE_STALE_SECONDS = 600
+# Dates kept in memory. /best-odds/range alone can touch 366 days per request;
+# the least recently stored dates are dropped beyond this.
+MAX_CACHED_DATES = 1024
+FINAL_GAME_STATES = {"OFF", "FINAL"}
+SETTLED_SCHEDULE_STATES = {"PPD", "CNCL"}
+
+
+def _to_iso(day) -> str:
+    if isinstance(day, datetime):
+        return day.date().isoformat()
+    if isinstance(day, date):
+        return day.isoformat()
+    return datetime.strptime(day, "%Y-%m-%d").date().isoformat()
+
+
+def schedule_is_final(iso_date: str, payload: Dict[str, Any]) -> bool:
+    """
+    A past date whose games are all over (or postponed/cancelled) never changes again,
+    so its snapshot can be served forever. An empty day only counts when upstream
+    explicitly reported zero games.
+    """
+    if iso_date >= datetime.today().date().isoformat():
+        return False
+    games = payload.get("games")
+    if games is None:
+        # The day was not in the returned gameWeek: nothing is known about it yet.
+        return False
+    if not games:
+        return payload.get("numberOfGames") == 0
+    return all(
+        game.get("gameState") in FINAL_GAME_STATES or game.get("gameScheduleState") in SETTLED_SCHEDULE_STATES
+        for game in games
+    )
+
+
+def _fetch_schedule_upstream(iso_date: str) -> Dict[str, Any]:
+    return fetch_with_snapshot(
+        "schedule", {"date": iso_date},
+        lambda: nhl_client().schedule.get_schedule(date=iso_date),
+        is_immutable=lambda payload: schedule_is_final(iso_date, payload),
+    )
+
+
+async def _afetch_schedule_upstream(iso_date: str) -> Dict[str, Any]:
+    return await afetch_with_snapshot(
+        "schedule", {"date": iso_date},
+        lambda: nhl_async_client.get_schedule(iso_date),
+        is_immutable=lambda payload: schedule_is_final(iso_date, payload),
+    )
+
+
+class ScheduleCache:
+    """
+    Process-wide store of NHL schedule payloads keyed by ISO date.
+    Past dates whose games are all final are kept until evicted, other dates
+    expire after `ttl_seconds`, at most `max_dates` dates are kept, and
+    concurrent misses for the same date share one fetch.
+    Sync handlers use get_schedule/get_games; async handlers use the `a`-prefixed
+    variants, which share the same store and in-flight bookkeeping.
+    Every stored payload is also parsed once into a GameTable (get_table/aget_table).
+    """
+    def __init__(self, fetcher: Callable[[str], Dict[str, Any]] = _fetch_schedule_upstream,
+                 async_fetcher: Callable[[str], Awaitable[Dict[str, Any]]] = _afetch_schedule_upstream,
+                 ttl_seconds: int = CURRENT_SCHEDULE_TTL_SECONDS,
+                 stale_seconds: int = CURRENT_SCHEDULE_STALE_SECONDS,
+                 max_dates: int = MAX_CACHED_DATES):
+        self._async_fetcher = async_fetcher
+        self._ttl_seconds = ttl_seconds
+        self._max_dates = max_dates
+        self._store = register_cache(
+            TTLCache(fetcher, ttl=self._ttl_for, stale_ttl=stale_seconds, maxsize=max_dates, name="nhl_schedule")
+        )
+        self._tables: Dict[str, GameTable] = {}
+        self._store.on_store(self._ingest)
+
+    def _ingest(self, iso_date: str, payload) -> GameTable:
+        table = GameTable.from_payload(date.fromisoformat(iso_date), payload)
+        self._tables[iso_date] = table
+        if len(self._tables) > self._max_dates:
+            # Drop the tables of dates the store has evicted.
+            for stale_date in [d for d in list(self._tables) if self._store.peek(d) is None]:
+                self._tables.pop(stale_date, None)
+        return table
+
+    def _table_for(self, iso_date: str, payload) -> GameTable:
+        table = self._tables.get(iso_date)
+        if table is None or table.source is not payload:
+            # Only when a reader races a store; the listener normally got there first.
+            table = self._ingest(iso_date, payload)
+        return table
+
+    def _ttl_for(self, iso_date: str, payload) -> Optional[float]:
+        if schedule_is_final(iso_date, payload):
+            return None
+        return self._ttl_seconds
+
+    def get_schedule(self, day) -> Dict[str, Any]:
+        """
+        Returns the raw schedule payload for `day` (a date or YYYY-MM-DD string).
+        Upstream errors are raised to the caller and never cached.
+        """
+        iso_date = _to_iso(day)
+        return self._store.get(iso_date, iso_date)
+
+    def get_games(self, day) -> List[Dict[str, Any]]:
+        """
+        Returns only the list of games scheduled on `day`.
+        """
+        return self.get_schedule(day).get("games", [])
+
+    async def aget_schedule(self, day) -> Dict[str, Any]:
+        """
+        Async variant of get_schedule backed by the pooled async client.
+        """
+        iso_date = _to_iso(day)
+        return await self._store.aget(iso_date, self._async_fetcher, iso_date)
+
+    async def aget_games(self, day) -> List[Dict[str, Any]]:
+        return (await self.aget_schedule(day)).get("games", [])
+
+    def get_table(self, day) -> GameTable:
+        """
+        The GameTable of `day`, built when its payload was stored.
+        """
+        iso_date = _to_iso(day)
+        return self._table_for(iso_date, self._store.get(iso_date, iso_date))
+
+    async def aget_table(self, day) -> GameTable:
+        iso_date = _to_iso(day)
+        return self._table_for(iso_date, await self._store.aget(iso_date, self._async_fetcher, iso_date))
+
+    async def arefresh(self, day) -> Dict[str, Any]:
+        """
+        Fetches `day` from upstream even if it is cached, replacing the entry
+        only once the fetch succeeds. A fetch of `day` already in flight is
+        shared rather than repeated. Uncached days go through aget_schedule.
+        """
+        iso_date = _to_iso(day)
+        if self._store.peek(iso_date) is None:
+            return await self.aget_schedule(iso_date)
+        return await self._store.arefresh(iso_date, self._async_fetcher, iso_date)
+
+    def peek_games(self, day) -> List[Dict[str, Any]]:
+        """
+        Games on `day` from whatever is cached, however old; never fetches.
+        """
+        payload = self._store.peek(_to_iso(day))
+        return payload.get("games", []) if payload else []
+
+    async def prefetch(self, days: Iterable) -> None:
+        """
+        Concurrently warms the cache for every day in `days`.
+        Failures are left uncached so a later read retries them.
+        """
+        await asyncio.gather(*(self.aget_schedule(day) for day in days), return_exceptions=True)
+
+    def invalidate(self, day=None):
+        self._store.invalidate(None if day is None else _to_iso(day))
+        if day is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(_to_iso(day), None)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._store.stats()
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        served = lookups - stats["misses"]
+        return {
+            "entries": stats["size"],
+            "hits": stats["hits"],
+            "stale_hits": stats["stale_hits"],
+            "misses": stats["misses"],
+            "coalesced": stats["coalesced"],
+            "upstream_calls": stats["misses"] + stats["refreshes"],
+            "upstream_errors": stats["load_errors"],
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "oldest_age_seconds": stats["oldest_age_seconds"],
+        }
+
+
+schedule_cache = ScheduleCache()
@@ -0,0 +1,351 @@
+"""
+On-disk store of raw upstream NHL payloads.
+
+Every payload is kept as zlib-compressed JSON in SQLite, keyed by
+(endpoint, params, fetched_at). Snapshots marked immutable, such as the
+schedule of a past date whose games are all final, are served from disk
+without contacting the NHL API. Other snapshots are only read back as a
+fallback when the upstream fails, or in offline mode.
+
+Settings come from the environment:
+- NHL_SNAPSHOT_DB is the database path. The store is off unless it is set.
+- NHL_SNAPSHOT_OFFLINE=1 never calls upstream and serves the latest
+  snapshot of every key. Pointed at a frozen database, this gives a
+  reproducible offline fixture.
+- NHL_SNAPSHOT_HISTORY is how many snapshots to keep per key.
+
+Fetches hand their payload to a background writer thread, so a request
+never waits on SQLite, and a payload identical to the key's last saved one
+is not written again. The keys that have an immutable snapshot are kept in
+memory, so a fetch only reads SQLite when it can be served from disk.
+
+    NHL_SNAPSHOT_DB=data/nhl_snapshots.sqlite3 uvicorn main:app
+    python nhl_snapshots.py --db data/nhl_snapshots.sqlite3 summary
+    python nhl_snapshots.py --db data/nhl_snapshots.sqlite3 freeze fixture.sqlite3
+"""
+import argparse
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+SNAPSHOT_DB = os.getenv("NHL_SNAPSHOT_DB", "")
+SNAPSHOT_OFFLINE = os.getenv("NHL_SNAPSHOT_OFFLINE", "0") == "1"
+SNAPSHOT_HISTORY = int(os.getenv("NHL_SNAPSHOT_HISTORY", 24))
+# Keys whose last saved digest is remembered to skip unchanged payloads.
+MAX_TRACKED_KEYS = 4096
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    endpoint   TEXT    NOT NULL,
+    params     TEXT    NOT NULL,
+    fetched_at REAL    NOT NULL,
+    immutable  INTEGER NOT NULL DEFAULT 0,
+    payload    BLOB    NOT NULL,
+    PRIMARY KEY (endpoint, params, fetched_at)
+)
+"""
+
+
+class SnapshotMissing(LookupError):
+    """
+    Raised in offline mode when no snapshot exists for the requested key.
+    """
+
+
+class Snapshot(NamedTuple):
+    endpoint: str
+    params: Dict[str, Any]
+    fetched_at: float
+    immutable: bool
+    payload: Any
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _dump(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(blob: bytes):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class SnapshotStore:
+    """
+    SQLite-backed snapshot store shared by every thread and worker process.
+    Each thread gets its own connection; WAL mode lets workers read while
+    another one writes.
+    """
+    def __init__(self, path: str, history: int = SNAPSHOT_HISTORY):
+        self.path = path
+        self.history = history
+        self._local = threading.local()
+        self._digests: Dict[tuple, tuple] = {}
+        self._queue: Optional[queue.Queue] = None
+        self._writer_lock = threading.Lock()
+        self._immutable_keys: Optional[set] = None  # (endpoint, params key); loaded on first use
+        self._keys_lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.unchanged = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    def save(self, endpoint: str, params: Dict[str, Any], payload, immutable: bool = False,
+             fetched_at: Optional[float] = None) -> float:
+        """
+        Stores one payload and trims the key's history to the newest
+        `history` snapshots. Returns the snapshot's fetched_at.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        self._write(endpoint, _params_key(params), _dump(payload), immutable, fetched_at)
+        return fetched_at
+
+    def save_in_background(self, endpoint: str, params: Dict[str, Any], payload, immutable: bool = False):
+        """
+        Queues one payload for the writer thread and returns immediately.
+        The payload is serialised here, so the caller may go on to modify it.
+        """
+        item = (endpoint, _params_key(params), _dump(payload), immutable, time.time())
+        with self._writer_lock:
+            if self._queue is None:
+                self._queue = queue.Queue()
+                threading.Thread(target=self._drain, args=(self._queue,),
+                                 name="snapshot-writer", daemon=True).start()
+        self._queue.put(item)
+
+    def flush(self):
+        """
+        Blocks until every queued background save has been written.
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+    def _drain(self, pending: queue.Queue):
+        while True:
+            item = pending.get()
+            try:
+                self._write(*item)
+            except Exception as e:
+                logger.warning("Saving snapshot of %s %s failed: %s", item[0], item[1], e)
+            finally:
+                pending.task_done()
+
+    def _write(self, endpoint: str, key: str, raw: bytes, immutable: bool, fetched_at: float):
+        digest = (hashlib.blake2b(raw, digest_size=16).digest(), immutable)
+        if self._digests.get((endpoint, key)) == digest:
+            # Same payload as the newest snapshot of this key: nothing new to keep.
+            self.unchanged += 1
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (endpoint, params, fetched_at, immutable, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (endpoint, key, fetched_at, int(immutable), zlib.compress(raw, 6)),
+            )
+            conn.execute(
+                "DELETE FROM snapshots WHERE endpoint = ? AND params = ? AND fetched_at NOT IN ("
+                "SELECT fetched_at FROM snapshots WHERE endpoint = ? AND params = ? "
+                "ORDER BY fetched_at DESC LIMIT ?)",
+                (endpoint, key, endpoint, key, self.history),
+            )
+        if immutable:
+            with self._keys_lock:
+                if self._immutable_keys is not None:
+                    self._immutable_keys.add((endpoint, key))
+        if len(self._digests) >= MAX_TRACKED_KEYS:
+            self._digests.clear()
+        self._digests[(endpoint, key)] = digest
+        self.writes += 1
+
+    def has_immutable(self, endpoint: str, params: Dict[str, Any]) -> bool:
+        """
+        Whether (endpoint, params) has an immutable snapshot. Only the first
+        call reads SQLite; the answer comes from memory after that.
+        """
+        with self._keys_lock:
+            if self._immutable_keys is None:
+                rows = self._conn().execute("SELECT DISTINCT endpoint, params FROM snapshots WHERE immutable = 1")
+                self._immutable_keys = {tuple(row) for row in rows}
+        return (endpoint, _params_key(params)) in self._immutable_keys
+
+    def may_have_immutable(self, endpoint: str, params: Dict[str, Any]) -> bool:
+        """
+        has_immutable() without touching SQLite: True until the keys are loaded.
+        """
+        keys = self._immutable_keys
+        return keys is None or (endpoint, _params_key(params)) in keys
+
+    def latest(self, endpoint: str, params: Dict[str, Any], immutable_only: bool = False) -> Optional[Snapshot]:
+        """
+        Newest snapshot for (endpoint, params), or None.
+        """
+        sql = "SELECT fetched_at, immutable, payload FROM snapshots WHERE endpoint = ? AND params = ?"
+        if immutable_only:
+            sql += " AND immutable = 1"
+        row = self._conn().execute(sql + " ORDER BY fetched_at DESC LIMIT 1",
+                                   (endpoint, _params_key(params))).fetchone()
+        if row is None:
+            return None
+        self.reads += 1
+        return Snapshot(endpoint, params, row[0], bool(row[1]), _decode(row[2]))
+
+    def summary(self) -> Dict[str, Any]:
+        rows = self._conn().execute(
+            "SELECT endpoint, COUNT(DISTINCT params), COUNT(*), SUM(immutable), SUM(LENGTH(payload)), "
+            "MAX(fetched_at) FROM snapshots GROUP BY endpoint ORDER BY endpoint"
+        ).fetchall()
+        return {
+            "path": self.path,
+            "reads": self.reads,
+            "writes": self.writes,
+            "unchanged_skipped": self.unchanged,
+            "endpoints": {
+                endpoint: {"keys": keys, "snapshots": count, "immutable": immutable or 0,
+                           "compressed_bytes": size or 0, "newest_fetched_at": newest}
+                for endpoint, keys, count, immutable, size, newest in rows
+            },
+        }
+
+    def freeze(self, dest_path: str) -> int:
+        """
+        Copies the newest snapshot of every key into a new database at
+        `dest_path`, for use as an offline fixture. Returns the key count.
+        """
+        dest = SnapshotStore(dest_path, history=1)
+        rows = self._conn().execute(
+            "SELECT s.endpoint, s.params, s.fetched_at, s.immutable, s.payload FROM snapshots s "
+            "JOIN (SELECT endpoint, params, MAX(fetched_at) AS fetched_at FROM snapshots "
+            "GROUP BY endpoint, params) newest USING (endpoint, params, fetched_at)"
+        ).fetchall()
+        conn = dest._conn()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+snapshot_store: Optional[SnapshotStore] = SnapshotStore(SNAPSHOT_DB) if SNAPSHOT_DB else None
+if snapshot_store is not None:
+    atexit.register(snapshot_store.flush)
+
+
+def fetch_with_snapshot(endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any],
+                        is_immutable: Optional[Callable[[Any], bool]] = None,
+                        store: Optional[SnapshotStore] = None) -> Any:
+    """
+    Returns the payload for (endpoint, params):
+    - from an immutable snapshot if one exists (no upstream call);
+    - in offline mode, from the latest snapshot, raising SnapshotMissing if none;
+    - otherwise from `fetch()`, which is then snapshotted in the background
+      (immutable when `is_immutable(payload)` says so). If `fetch()` fails, the latest
+      snapshot is served instead, and the error is raised only when there is none.
+    """
+    store = store or snapshot_store
+    if store is None:
+        return fetch()
+    cached = _snapshot_before_fetch(store, endpoint, params)
+    if cached is not None:
+        return cached.payload
+    try:
+        payload = fetch()
+    except Exception as e:
+        return _snapshot_after_error(store, endpoint, params, e).payload
+    store.save_in_background(endpoint, params, payload, immutable=bool(is_immutable and is_immutable(payload)))
+    return payload
+
+
+async def afetch_with_snapshot(endpoint: str, params: Dict[str, Any], fetch: Callable[[], Awaitable[Any]],
+                               is_immutable: Optional[Callable[[Any], bool]] = None,
+                               store: Optional[SnapshotStore] = None) -> Any:
+    """
+    Async variant of fetch_with_snapshot; disk reads run in a worker thread.
+    """
+    store = store or snapshot_store
+    if store is None:
+        return await fetch()
+    if SNAPSHOT_OFFLINE or store.may_have_immutable(endpoint, params):
+        cached = await asyncio.to_thread(_snapshot_before_fetch, store, endpoint, params)
+        if cached is not None:
+            return cached.payload
+    try:
+        payload = await fetch()
+    except Exception as e:
+        snapshot = await asyncio.to_thread(_snapshot_after_error, store, endpoint, params, e)
+        return snapshot.payload
+    store.save_in_background(endpoint, params, payload, immutable=bool(is_immutable and is_immutable(payload)))
+    return payload
+
+
+def _snapshot_before_fetch(store: SnapshotStore, endpoint: str, params: Dict[str, Any]) -> Optional[Snapshot]:
+    if SNAPSHOT_OFFLINE:
+        snapshot = store.latest(endpoint, params)
+        if snapshot is None:
+            raise SnapshotMissing(f"No snapshot for {endpoint} {_params_key(params)} in offline mode")
+        return snapshot
+    if not store.has_immutable(endpoint, params):
+        return None
+    return store.latest(endpoint, params, immutable_only=True)
+
+
+def _snapshot_after_error(store: SnapshotStore, endpoint: str, params: Dict[str, Any], error: Exception) -> Snapshot:
+    snapshot = store.latest(endpoint, params)
+    if snapshot is None:
+        raise error
+    logger.warning("Upstream %s %s failed (%s); serving snapshot from %s", endpoint, _params_key(params), error,
+                   time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.fetched_at)))
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=SNAPSHOT_DB or None, required=not SNAPSHOT_DB,
+                        help="snapshot database path (default: NHL_SNAPSHOT_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("summary", help="print snapshot counts and sizes per endpoint")
+    freeze = commands.add_parser("freeze", help="copy the newest snapshot of every key into a fixture database")
+    freeze.add_argument("dest")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.db)
+    if args.command == "summary":
+        print(json.dumps(store.summary(), indent=2))
+    elif args.command == "freeze":
+        print(f"Froze {store.freeze(args.dest)} keys into {args.dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Time-zone conversion for schedule columns.
+
+Start times arrive as UTC instants. A game's local time is the wall-clock time
+in its arena's IANA zone (see nhl_venues.venue_timezones), which follows
+that zone's own DST rules, whatever zone the server itself runs in.
+
+ZoneInfo objects are built once per zone. UTC offsets are memoised per
+(zone, UTC hour): every North American DST transition falls on a whole UTC
+hour, so the offset is constant within one. Converting a column therefore
+costs one cache lookup per game; the tz calculation runs once per zone
+and start hour.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Sequence, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from nhl_venues import venue_timezones
+
+EASTERN = "America/New_York"
+CENTRAL = "America/Chicago"
+# Used for games whose arena is not in the venue table; the NHL lists times in Eastern.
+DEFAULT_TIMEZONE = EASTERN
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> Optional[ZoneInfo]:
+    """
+    Shared ZoneInfo for an IANA zone name, or None if the name is unknown.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        return None
+
+
+def venue_timezone(venue_name: Optional[str], reported: Optional[str] = None) -> str:
+    """
+    IANA zone of an arena: the zone the payload reports, if valid, else the
+    venue table's entry, else DEFAULT_TIMEZONE.
+    """
+    if reported and get_zone(reported) is not None:
+        return reported
+    return venue_timezones.get(venue_name, DEFAULT_TIMEZONE)
+
+
+@lru_cache(maxsize=65536)
+def _offset_minutes(zone_name: str, utc_hour: int) -> int:
+    instant = datetime.fromtimestamp(utc_hour * 3600, tz=timezone.utc)
+    return int(instant.astimezone(get_zone(zone_name)).utcoffset().total_seconds() // 60)
+
+
+def utc_offsets(start_utc: np.ndarray, zones: Union[str, Sequence[str], np.ndarray]) -> np.ndarray:
+    """
+    UTC offset in minutes (int16) at each instant of `start_utc`
+    (datetime64), in one zone for every row or one zone per row.
+    Rows whose instant is NaT get 0.
+    """
+    start_utc = np.asarray(start_utc, dtype="datetime64[s]")
+    hours = np.floor_divide(start_utc.astype(np.int64), 3600).tolist()
+    if isinstance(zones, str):
+        zones = [zones] * len(hours)
+    valid = (~np.isnat(start_utc)).tolist()
+    return np.fromiter(
+        (_offset_minutes(zone, hour) if ok else 0 for zone, hour, ok in zip(zones, hours, valid)),
+        dtype=np.int16, count=len(hours),
+    )
+
+
+def to_local(start_utc: np.ndarray, zones: Union[str, Sequence[str], np.ndarray],
+             offsets: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Wall-clock times (datetime64[m]) of `start_utc` in `zones`; NaT stays NaT.
+    Pass `offsets` from utc_offsets() to skip recomputing them.
+    """
+    if offsets is None:
+        offsets = utc_offsets(start_utc, zones)
+    return np.asarray(start_utc).astype("datetime64[m]") + offsets.astype("timedelta64[m]")
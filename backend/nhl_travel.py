@@ -0,0 +1,300 @@
+import logging
+from collections import defaultdict, deque
+from datetime import timedelta
+
+import numpy as np
+
+from nhl_distance import DistanceMatrix
+from nhl_game_table import GameTable
+from nhl_schedule_cache import schedule_cache
+from nhl_venues import team_home_venues, venue_coords
+
+# Built once at startup; venues reported in schedule payloads are added as they are seen.
+distance_matrix = DistanceMatrix(venue_coords)
+
+logger = logging.getLogger(__name__)
+
+def get_team_games(games):
+    """
+    Organize games by team.
+    `games` is a GameTable (or a list of raw schedule games, which is tabled first).
+    Returns a dictionary where keys are team names and values are lists of tuples:
+    (game_date, lat, lon, is_home).
+    Games without a parseable start time or a known venue location are skipped.
+    """
+    table = games if isinstance(games, GameTable) else GameTable.from_games(games)
+    if table.locations:
+        distance_matrix.add_coordinates(table.locations)
+    team_games = defaultdict(list)
+    for team, entries in table.derived("team_games", _team_entries).items():
+        team_games[team] = list(entries)
+    return team_games
+
+def _team_entries(table):
+    usable = (~np.isnat(table.game_date) & ~np.isnan(table.venue_lat)).tolist()
+    game_dates = table.tolist("game_date")
+    lats = table.tolist("venue_lat")
+    lons = table.tolist("venue_lon")
+    entries = {}
+    for team, appearances in table.by_team.items():
+        team_entries = tuple(
+            (game_dates[row], lats[row], lons[row], is_home)
+            for row, is_home in appearances if usable[row]
+        )
+        if team_entries:
+            entries[team] = team_entries
+    return entries
+
+def calculate_travel_distance(games_list, team, home_venue=None):
+    """
+    Compute cumulative travel for a team based on a list of games.
+    If the first game is away and home_venue is provided, add the distance from home to that game.
+    """
+    games_list.sort(key=lambda x: x[0])
+    total_distance = 0
+    if home_venue and games_list and not games_list[0][3]:
+        home_coords = venue_coords.get(home_venue)
+        if home_coords:
+            total_distance += distance_matrix.distance(home_coords[0], home_coords[1], games_list[0][1], games_list[0][2])
+    if not games_list:
+        return total_distance
+    prev_lat, prev_lon = games_list[0][1], games_list[0][2]
+    for game in games_list[1:]:
+        lat, lon = game[1], game[2]
+        total_distance += distance_matrix.distance(prev_lat, prev_lon, lat, lon)
+        prev_lat, prev_lon = lat, lon
+    return total_distance
+
+
+def _load_table(cache, day):
+    try:
+        return cache.get_table(day)
+    except Exception as e:
+        logger.warning("Error loading schedule for %s: %s", day, e)
+        return GameTable.empty(day)
+
+
+class ScheduleWindow:
+    """
+    Schedule data for [target_date - lookback_days, target_date], fetched once.
+    Travel totals, each team's last game and the away teams of any day in the
+    window are all derived from this single load, through the days' GameTables.
+    """
+    def __init__(self, target_date, lookback_days=3, cache=schedule_cache):
+        self.target_date = target_date
+        self.lookback_days = lookback_days
+        self.start_date = target_date - timedelta(days=lookback_days)
+        self._cache = cache
+        self.tables_by_date = {}
+        current_date = self.start_date
+        while current_date <= target_date:
+            self.tables_by_date[current_date] = _load_table(cache, current_date)
+            current_date += timedelta(days=1)
+        self.team_games = get_team_games(GameTable.concat(list(self.tables_by_date.values())))
+        self._travel_data = None
+        self._team_last_game = None
+
+    @property
+    def target_table(self):
+        return self.tables_by_date[self.target_date]
+
+    def table_on(self, day):
+        if day in self.tables_by_date:
+            return self.tables_by_date[day]
+        # Days outside the window (e.g. yesterday with lookback_days=0) still go through the cache.
+        return _load_table(self._cache, day)
+
+    def away_teams_on(self, day):
+        """
+        Set of team names that played an away game on `day`.
+        """
+        return self.table_on(day).away_teams()
+
+    def _games_in_window(self, games_list):
+        return [g for g in games_list if self.start_date <= g[0] <= self.target_date]
+
+    @property
+    def travel_data(self):
+        """
+        Cumulative travel over the window for every team playing on target_date.
+        Anchors calculation to the team's home venue if needed.
+        """
+        if self._travel_data is None:
+            travel_data = {}
+            for team, games_list in self.team_games.items():
+                filtered_games = self._games_in_window(games_list)
+                if any(g[0] == self.target_date for g in filtered_games):
+                    home_venue = team_home_venues.get(team)
+                    travel_data[team] = calculate_travel_distance(filtered_games, team, home_venue)
+            self._travel_data = travel_data
+        return self._travel_data
+
+    @property
+    def team_last_game(self):
+        """
+        Each team's most recent (game_date, lat, lon, is_home) in the window.
+        """
+        if self._team_last_game is None:
+            team_last_game = {}
+            for team, games_list in self.team_games.items():
+                filtered = self._games_in_window(games_list)
+                if filtered:
+                    team_last_game[team] = max(filtered, key=lambda x: x[0])
+            self._team_last_game = team_last_game
+        return self._team_last_game
+
+
+class _TeamTrail:
+    """
+    A team's games inside the sliding window, in date order, together with the
+    distance of every leg between consecutive games.
+    """
+    __slots__ = ("games", "legs")
+
+    def __init__(self):
+        self.games = deque()  # (game_date, lat, lon, is_home, schedule_day)
+        self.legs = deque()   # legs[i] is the distance from games[i] to games[i + 1]
+
+    def append(self, entry):
+        if self.games:
+            last = self.games[-1]
+            self.legs.append(distance_matrix.distance(last[1], last[2], entry[1], entry[2]))
+        self.games.append(entry)
+
+    def evict_before(self, day):
+        while self.games and self.games[0][4] < day:
+            self.games.popleft()
+            if self.legs:
+                self.legs.popleft()
+
+    def last_game(self):
+        # The first of the games on the latest date, as max() picks in
+        # ScheduleWindow.team_last_game: a late game listed on day D starts on
+        # D + 1 UTC, and a team can play again later that same UTC date.
+        games = self.games
+        last = len(games) - 1
+        while last and games[last - 1][0] == games[-1][0]:
+            last -= 1
+        return games[last][:4]
+
+    def distance(self, home_venue=None):
+        # Same accumulation order as calculate_travel_distance.
+        total_distance = 0
+        first = self.games[0]
+        if home_venue and not first[3]:
+            home_coords = venue_coords.get(home_venue)
+            if home_coords:
+                total_distance += distance_matrix.distance(home_coords[0], home_coords[1], first[1], first[2])
+        for leg in self.legs:
+            total_distance += leg
+        return total_distance
+
+
+class TravelWindow:
+    """
+    The view of a SlidingTravelEngine at one target date. Exposes the same
+    attributes as ScheduleWindow so the best-odds and matchup builders accept either.
+    """
+    def __init__(self, target_date, lookback_days, tables_by_date, travel_data, team_last_game):
+        self.target_date = target_date
+        self.lookback_days = lookback_days
+        self.start_date = target_date - timedelta(days=lookback_days)
+        self.tables_by_date = tables_by_date
+        self.travel_data = travel_data
+        self.team_last_game = team_last_game
+
+    @property
+    def target_table(self):
+        return self.table_on(self.target_date)
+
+    def table_on(self, day):
+        table = self.tables_by_date.get(day)
+        return table if table is not None else GameTable.empty(day)
+
+    def away_teams_on(self, day):
+        """
+        Set of team names that played an away game on `day`.
+        """
+        return self.table_on(day).away_teams()
+
+
+class SlidingTravelEngine:
+    """
+    Walks [start_date - lookback_days, end_date] once and yields a TravelWindow
+    for every target date in [start_date, end_date]. With lookback_days=0 the
+    day before start_date is read as well, for the back-to-back check.
+
+    Each schedule day is fetched and parsed exactly once. Per-team games live in
+    a deque: the new day is appended, days older than the window are evicted,
+    and each leg's distance is looked up once when it enters the window.
+    """
+    def __init__(self, start_date, end_date, lookback_days=3, cache=schedule_cache):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.lookback_days = lookback_days
+        self._cache = cache
+
+    @property
+    def history_days(self):
+        # Back-to-back checks read the day before each target date, so its
+        # table is kept even when lookback_days is 0.
+        return max(self.lookback_days, 1)
+
+    def days(self):
+        """
+        Every schedule day the engine reads, oldest first.
+        """
+        current_date = self.start_date - timedelta(days=self.history_days)
+        days = []
+        while current_date <= self.end_date:
+            days.append(current_date)
+            current_date += timedelta(days=1)
+        return days
+
+    async def prefetch(self):
+        """
+        Fetches every day of the range concurrently so windows() only reads warm cache entries.
+        """
+        await self._cache.prefetch(self.days())
+
+    def windows(self):
+        trails = defaultdict(_TeamTrail)
+        # Games are dated by their UTC start, so a late game on schedule day D
+        # belongs to D + 1 and only enters the window once D + 1 is reached.
+        pending = []
+        tables_by_date = {}
+        current_date = self.start_date - timedelta(days=self.history_days)
+        while current_date <= self.end_date:
+            table = _load_table(self._cache, current_date)
+            tables_by_date[current_date] = table
+            window_start = current_date - timedelta(days=self.lookback_days)
+            tables_by_date.pop(current_date - timedelta(days=self.history_days + 1), None)
+
+            arriving, pending = pending, []
+            for team, entries in get_team_games(table).items():
+                for game_date, lat, lon, is_home in entries:
+                    entry = (game_date, lat, lon, is_home, current_date)
+                    if game_date <= current_date:
+                        arriving.append((team, entry))
+                    else:
+                        pending.append((team, entry))
+            arriving.sort(key=lambda item: item[1][0])
+            for team, entry in arriving:
+                trails[team].append(entry)
+
+            for team in list(trails):
+                trail = trails[team]
+                trail.evict_before(window_start)
+                if not trail.games:
+                    del trails[team]
+
+            if current_date >= self.start_date:
+                travel_data = {}
+                team_last_game = {}
+                for team, trail in trails.items():
+                    team_last_game[team] = trail.last_game()
+                    if trail.games[-1][0] == current_date:
+                        travel_data[team] = trail.distance(team_home_venues.get(team))
+                yield TravelWindow(current_date, self.lookback_days, dict(tables_by_date),
+                                   travel_data, team_last_game)
+            current_date += timedelta(days=1)
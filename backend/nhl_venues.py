@@ -0,0 +1,86 @@
+# Expanded mapping of arena names to (latitude, longitude)
+venue_coords = {
+    "Amalie Arena": (27.9476, -82.4572),
+    "Amerant Bank Arena": (43.0389, -87.9065),
+    "American Airlines Center": (32.7905, -96.8104),
+    "Ball Arena": (39.7439, -104.9942),
+    "Bridgestone Arena": (36.1667, -86.7783),
+    "Canada Life Centre": (49.8951, -97.1384),
+    "Canadian Tire Centre": (45.3266, -75.7230),
+    "Capital One Arena": (38.8983, -77.0201),
+    "Centre Bell": (45.5048, -73.5772),
+    "Climate Pledge Arena": (47.6225, -122.3505),
+    "Crypto.com Arena": (34.0430, -118.2673),
+    "Delta Center": (40.7683, -111.8881),
+    "Enterprise Center": (38.6287, -90.1970),
+    "Ford Field": (42.3400, -83.0456),
+    "Honda Center": (33.8003, -117.8827),
+    "KeyBank Center": (42.8864, -78.8784),
+    "Lenovo Center": (42.7300, -73.6800),
+    "Little Caesars Arena": (42.3410, -83.0458),
+    "Madison Square Garden": (40.7505, -73.9934),
+    "MetLife Stadium": (40.8135, -74.0745),
+    "Nationwide Arena": (39.9690, -82.9988),
+    "Ohio Stadium": (40.0026, -83.0163),
+    "PPG Paints Arena": (40.4398, -80.0027),
+    "Prudential Center": (40.7330, -74.1687),
+    "Rogers Arena": (49.2827, -123.1207),
+    "Rogers Place": (53.5461, -113.4938),
+    "Scotiabank Arena": (43.6435, -79.3791),
+    "Scotiabank Saddledome": (51.0447, -114.0719),
+    "T-Mobile Arena": (36.1024, -115.1728),
+    "TD Garden": (42.3662, -71.0621),
+    "UBS Arena": (40.7371, -73.7076),
+    "United Center": (41.8807, -87.6742),
+    "Wells Fargo Center": (39.9012, -75.1726),
+    "Xcel Energy Center": (44.9537, -93.0900),
+    "Coors Field": (39.7555, -104.9942)
+}
+
+# Mapping of team names to their home venue names.
+team_home_venues = {
+    "Jets": "Canada Life Centre",
+    "Winnipeg Jets": "Canada Life Centre",
+    "Utah Hockey Club": "Delta Center"
+}
+
+# Mapping of arena names to their IANA time zone.
+venue_timezones = {
+    "Amalie Arena": "America/New_York",
+    "Amerant Bank Arena": "America/New_York",
+    "American Airlines Center": "America/Chicago",
+    "Ball Arena": "America/Denver",
+    "Bridgestone Arena": "America/Chicago",
+    "Canada Life Centre": "America/Winnipeg",
+    "Canadian Tire Centre": "America/Toronto",
+    "Capital One Arena": "America/New_York",
+    "Centre Bell": "America/Toronto",
+    "Climate Pledge Arena": "America/Los_Angeles",
+    "Crypto.com Arena": "America/Los_Angeles",
+    "Delta Center": "America/Denver",
+    "Enterprise Center": "America/Chicago",
+    "Ford Field": "America/Detroit",
+    "Honda Center": "America/Los_Angeles",
+    "KeyBank Center": "America/New_York",
+    "Lenovo Center": "America/New_York",
+    "Little Caesars Arena": "America/Detroit",
+    "Madison Square Garden": "America/New_York",
+    "MetLife Stadium": "America/New_York",
+    "Mullett Arena": "America/Phoenix",
+    "Nationwide Arena": "America/New_York",
+    "Ohio Stadium": "America/New_York",
+    "PPG Paints Arena": "America/New_York",
+    "Prudential Center": "America/New_York",
+    "Rogers Arena": "America/Vancouver",
+    "Rogers Place": "America/Edmonton",
+    "SAP Center at San Jose": "America/Los_Angeles",
+    "Scotiabank Arena": "America/Toronto",
+    "Scotiabank Saddledome": "America/Edmonton",
+    "T-Mobile Arena": "America/Los_Angeles",
+    "TD Garden": "America/New_York",
+    "UBS Arena": "America/New_York",
+    "United Center": "America/Chicago",
+    "Wells Fargo Center": "America/New_York",
+    "Xcel Energy Center": "America/Chicago",
+    "Coors Field": "America/Denver"
+}
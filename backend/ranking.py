@@ -0,0 +1,64 @@
+import heapq
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def top_k(items: Iterable[Any], k: int, key: Callable[[Any], Tuple],
+          group: Optional[Callable[[Any], Hashable]] = None, cap: Optional[int] = None) -> List[Any]:
+    """
+    The `k` best items by `key` (highest first) in a single streaming pass.
+
+    When `group` and `cap` are given, at most `cap` items per group are kept,
+    which gives the same result as sorting everything and taking items greedily
+    while a group still has quota. Ties on `key` go to the item seen first.
+    """
+    if k <= 0:
+        return []
+    if group is None or cap is None:
+        heap = []
+        for seq, item in enumerate(items):
+            rank = (key(item), -seq)
+            if len(heap) < k:
+                heapq.heappush(heap, (rank, item))
+            elif rank > heap[0][0]:
+                heapq.heapreplace(heap, (rank, item))
+        survivors = heap
+    else:
+        # One bounded min-heap per group holds that group's best `cap` items.
+        per_group: Dict[Hashable, list] = {}
+        for seq, item in enumerate(items):
+            rank = (key(item), -seq)
+            heap = per_group.setdefault(group(item), [])
+            if len(heap) < cap:
+                heapq.heappush(heap, (rank, item))
+            elif rank > heap[0][0]:
+                heapq.heapreplace(heap, (rank, item))
+        survivors = (entry for heap in per_group.values() for entry in heap)
+    # Ranks are unique (they end in -seq), so items themselves are never compared.
+    return [item for _, item in heapq.nlargest(k, survivors, key=lambda entry: entry[0])]
+
+
+class RankingCache:
+    """
+    Memoises precomputed rankings per key (e.g. (season, category, cap)).
+    An entry is reused only while it was built from the same `source` object,
+    so a refreshed stats cache invalidates every ranking derived from it.
+    """
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, source: Any, build: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is source:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not source:
+                entry = (source, build())
+                self._entries[key] = entry
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
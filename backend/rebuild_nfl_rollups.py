@@ -0,0 +1,51 @@
+"""
+Recomputes the NFL rollup tables from the raw game rows.
+
+Game rows written through an NflSession keep the rollups current, but NFL
+data is loaded from outside the app (bulk inserts, raw SQL, other tools),
+which bypasses those flush listeners. Run this after every such load, or
+/nfl/teams, /nfl/standings and the stat leaderboards keep serving the
+totals of the previous one:
+
+    python rebuild_nfl_rollups.py
+    python rebuild_nfl_rollups.py --season 2024
+
+Uses DATABASE_URL, like the app. Each run replaces the rollup rows of the
+given season (or of every season) in every rollup table, in one transaction.
+"""
+import argparse
+import sys
+import time
+
+import nfl_models
+
+# Each rollup table and the function that recomputes it from the raw rows.
+ROLLUPS = {
+    "nfl_team_season_records": nfl_models.rebuild_team_season_records,
+    "nfl_player_season_stats": nfl_models.rebuild_player_season_stats,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--season", help="rebuild only this season (default: every season)")
+    parser.add_argument("--table", choices=sorted(ROLLUPS), action="append",
+                        help="rebuild only this rollup table; repeatable (default: all of them)")
+    args = parser.parse_args()
+
+    nfl_models.init_engine()
+    db = nfl_models.SessionLocal()
+    try:
+        for table in args.table or ROLLUPS:
+            start = time.perf_counter()
+            rows = ROLLUPS[table](db, args.season)
+            print(f"{table}: {rows} rows in {time.perf_counter() - start:.2f}s")
+        db.commit()
+    finally:
+        db.close()
+        nfl_models.dispose_engine()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from main import etag_matches
+from nhl_charts import ChartService
+
+CHART = {"items": [("EDM", 1200.5), ("TOR", 310.0)], "xlabel": "Team", "ylabel": "km", "title": "Travel"}
+
+
+class CountingChartService(ChartService):
+    def __init__(self):
+        super().__init__()
+        self.renders = 0
+
+    def _render(self, items, xlabel, ylabel, title, fmt):
+        self.renders += 1
+        time.sleep(0.05)
+        return f"{title}.{fmt}".encode()
+
+
+def test_concurrent_requests_share_one_render():
+    service = CountingChartService()
+    bodies = []
+    threads = [threading.Thread(target=lambda: bodies.append(service.bar_chart(**CHART))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert bodies == [b"Travel.png"] * 8
+    assert service.renders == 1
+    service.bar_chart(**CHART, fmt="svg")
+    assert service.renders == 2
+
+
+def test_render_runs_in_the_worker_pool():
+    service = ChartService(max_workers=1)
+    try:
+        assert service.bar_chart(**CHART).startswith(b"\x89PNG")
+        assert b"<svg" in service.bar_chart(**CHART, fmt="svg")
+    finally:
+        service.shutdown()
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('"xyz"', False),
+    ("*", True),
+    ('"ab"', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, '"abc"') is matches
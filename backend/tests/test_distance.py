@@ -0,0 +1,39 @@
+import pytest
+
+import nhl_distance
+from nhl_distance import DistanceMatrix, haversine
+
+VENUES = {
+    "Rogers Place": (53.5469, -113.4979),
+    "Scotiabank Arena": (43.6435, -79.3791),
+    "Crypto.com Arena": (34.0430, -118.2673),
+}
+
+
+def test_nearby_coordinates_snap_to_the_known_venue():
+    matrix = DistanceMatrix(VENUES)
+    reported = (53.5471, -113.4982)  # Rogers Place, a few metres off
+    matrix.add_coordinates([reported])
+
+    assert len(matrix) == len(VENUES)
+    assert matrix.distance(*reported, 43.6435, -79.3791) == matrix.between_venues("Rogers Place", "Scotiabank Arena")
+
+
+def test_new_coordinates_get_their_own_row():
+    matrix = DistanceMatrix(VENUES)
+    matrix.add_coordinates([(39.7487, -105.0077)])
+
+    assert len(matrix) == len(VENUES) + 1
+    assert matrix.distance(39.7487, -105.0077, 43.6435, -79.3791) == pytest.approx(
+        haversine(39.7487, -105.0077, 43.6435, -79.3791))
+
+
+def test_extra_points_are_capped(monkeypatch):
+    monkeypatch.setattr(nhl_distance, "MAX_EXTRA_POINTS", 3)
+    matrix = DistanceMatrix(VENUES)
+    far_apart = [(10.0 + i, 10.0 + i) for i in range(10)]
+    matrix.add_coordinates(far_apart)
+
+    assert len(matrix) == len(VENUES) + 3
+    # Untracked coordinates still get the exact distance.
+    assert matrix.distance(19.0, 19.0, 43.6435, -79.3791) == pytest.approx(haversine(19.0, 19.0, 43.6435, -79.3791))
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import nfl_models
+from bench_nfl_queries import seed
+from nfl_router import router
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('nfl') / 'players.sqlite3'}")
+    nfl_models.Base.metadata.create_all(engine)
+    # The 2023 season has no games, so only players with 2024 stat lines match it.
+    seed(engine, ["2024"], upcoming_season="2025")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def client(engine):
+    def get_db():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[nfl_models.get_db] = get_db
+    return TestClient(app)
+
+
+def player_ids(engine, *criteria):
+    with Session(engine) as db:
+        query = select(nfl_models.NflPlayer.player_id).where(*criteria).order_by(nfl_models.NflPlayer.player_id)
+        return list(db.scalars(query))
+
+
+def all_pages(client, **params):
+    pages, after = [], None
+    while True:
+        body = client.get("/nfl/players", params={**params, **({"after": after} if after else {})}).json()
+        pages.append(body["players"])
+        after = body["next_after"]
+        if after is None:
+            return pages
+
+
+def test_pages_cover_every_player_once_in_order(client, engine):
+    pages = all_pages(client, limit=37)
+    ids = [player["player_id"] for page in pages for player in page]
+
+    assert ids == player_ids(engine)
+    assert all(len(page) == 37 for page in pages[:-1]) and 0 < len(pages[-1]) <= 37
+
+
+def first_team(engine):
+    with Session(engine) as db:
+        return db.get(nfl_models.NflPlayer, player_ids(engine)[0]).team
+
+
+def test_filters_apply_across_pages(client, engine):
+    team = first_team(engine)
+    pages = all_pages(client, team=team, limit=5)
+    assert [p["player_id"] for page in pages for p in page] == player_ids(engine, nfl_models.NflPlayer.team == team)
+
+
+def test_exact_multiple_of_the_page_size_has_no_empty_last_page(client, engine):
+    team = first_team(engine)
+    total = len(player_ids(engine, nfl_models.NflPlayer.team == team))
+    body = client.get("/nfl/players", params={"team": team, "limit": total}).json()
+    assert len(body["players"]) == total and body["next_after"] is None
+
+
+def test_season_keeps_players_with_a_stat_line(client):
+    assert client.get("/nfl/players", params={"season": "2023"}).json()["players"] == []
+    assert client.get("/nfl/players", params={"season": "2024-2025", "limit": 1}).json()["players"]
+
+
+def test_fields_select_columns_and_keep_the_cursor(client):
+    players = client.get("/nfl/players", params={"fields": "full_name", "limit": 3}).json()["players"]
+    assert [set(player) for player in players] == [{"player_id", "full_name"}] * 3
+
+    response = client.get("/nfl/players", params={"fields": "full_name,salary"})
+    assert response.status_code == 400
+    assert "salary" in response.json()["detail"]
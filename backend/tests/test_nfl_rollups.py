@@ -0,0 +1,42 @@
+import shutil
+
+import pytest
+from sqlalchemy import create_engine
+
+import nfl_models
+from verify_nfl_rollups import SCENARIOS, prepare_database, run_scenario
+
+
+@pytest.fixture(scope="module")
+def seeded_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("nfl") / "seeded.sqlite3"
+    prepare_database(f"sqlite:///{path}").dispose()
+    return path
+
+
+@pytest.fixture
+def engine(seeded_file, tmp_path):
+    # Every test gets its own copy of the seeded database.
+    path = tmp_path / "nfl.sqlite3"
+    shutil.copy(seeded_file, path)
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(params=["upsert", "select-then-update"])
+def rollup_writes(request, monkeypatch):
+    if request.param == "select-then-update":
+        # What dialects without an upsert construct use.
+        monkeypatch.setattr(nfl_models, "_UPSERTS", {})
+    return request.param
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+def test_rollups_match_a_rebuild(engine, rollup_writes, scenario):
+    assert run_scenario(engine, SCENARIOS[scenario]) == []
+
+
+def test_scenarios_in_sequence(engine):
+    for name, scenario in SCENARIOS.items():
+        assert run_scenario(engine, scenario) == [], name
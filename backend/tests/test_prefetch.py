@@ -0,0 +1,21 @@
+from datetime import date
+
+import pytest
+
+import nhl_prefetch
+from nhl_prefetch import prefetch_season
+
+
+@pytest.mark.parametrize("today, season", [
+    (date(2024, 10, 1), "20242025"),
+    (date(2025, 3, 15), "20242025"),
+    (date(2025, 8, 1), "20242025"),
+    (date(2025, 10, 18), "20252026"),
+])
+def test_prefetch_season_follows_the_calendar(today, season):
+    assert prefetch_season(today) == season
+
+
+def test_prefetch_season_can_be_pinned(monkeypatch):
+    monkeypatch.setattr(nhl_prefetch, "PREFETCH_SEASON", "20232024")
+    assert prefetch_season(date(2025, 10, 18)) == "20232024"
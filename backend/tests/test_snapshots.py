@@ -0,0 +1,37 @@
+from nhl_snapshots import SnapshotStore, fetch_with_snapshot
+
+
+def test_immutable_snapshot_is_served_without_fetching(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"games": [1, 2]}
+
+    first = fetch_with_snapshot("schedule", {"date": "2024-01-01"}, fetch, is_immutable=lambda _: True, store=store)
+    store.flush()
+    second = fetch_with_snapshot("schedule", {"date": "2024-01-01"}, fetch, is_immutable=lambda _: True, store=store)
+
+    assert first == second == {"games": [1, 2]}
+    assert len(calls) == 1
+
+
+def test_mutable_keys_do_not_read_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    for _ in range(3):
+        fetch_with_snapshot("schedule", {"date": "2099-01-01"}, lambda: {"games": []}, store=store)
+        store.flush()
+
+    assert store.reads == 0
+    assert not store.may_have_immutable("schedule", {"date": "2099-01-01"})
+
+
+def test_upstream_error_falls_back_to_the_latest_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    store.save("schedule", {"date": "2099-01-01"}, {"games": ["old"]})
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    assert fetch_with_snapshot("schedule", {"date": "2099-01-01"}, fail, store=store) == {"games": ["old"]}
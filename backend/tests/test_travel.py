@@ -0,0 +1,105 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from main import best_odds_for_date, get_games_with_travel_for_date
+from nhl_schedule_cache import ScheduleCache
+from nhl_travel import ScheduleWindow, SlidingTravelEngine
+
+# (team, home venue); the Jets' travel is anchored to their home arena.
+TEAMS = [
+    ("Jets", "Canada Life Centre"), ("Bruins", "TD Garden"), ("Kings", "Crypto.com Arena"),
+    ("Oilers", "Rogers Place"), ("Rangers", "Madison Square Garden"), ("Stars", "American Airlines Center"),
+    ("Blackhawks", "United Center"), ("Canucks", "Rogers Arena"), ("Penguins", "PPG Paints Arena"),
+    ("Avalanche", "Ball Arena"), ("Lightning", "Amalie Arena"), ("Maple Leafs", "Scotiabank Arena"),
+]
+# Start hours (UTC) relative to the schedule day; past 24 the game starts on the next UTC date.
+START_HOURS = (17, 19, 23, 24.5, 26)
+FIRST_DAY = date(2025, 1, 1)
+DAYS = 24
+
+
+def synthetic_schedule(seed=11):
+    rng = random.Random(seed)
+    schedule = {}
+    game_id = 0
+    for offset in range(DAYS):
+        day = FIRST_DAY + timedelta(days=offset)
+        teams = rng.sample(TEAMS, 2 * rng.randint(2, 5))
+        games = []
+        for (home, venue), (away, _) in zip(teams[::2], teams[1::2]):
+            game_id += 1
+            start = datetime(day.year, day.month, day.day) + timedelta(hours=rng.choice(START_HOURS))
+            games.append({
+                "id": game_id,
+                "startTimeUTC": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "homeTeam": {"id": TEAMS.index((home, venue)), "commonName": {"default": home}},
+                "awayTeam": {"id": 100 + game_id, "commonName": {"default": away}},
+                "venue": {"default": venue},
+                "gameState": "FINAL",
+            })
+        schedule[day.isoformat()] = {"games": games, "numberOfGames": len(games)}
+    return schedule
+
+
+@pytest.fixture
+def cache():
+    schedule = synthetic_schedule()
+
+    def fetch(iso_date):
+        return schedule.get(iso_date, {"games": [], "numberOfGames": 0})
+
+    async def afetch(iso_date):
+        return fetch(iso_date)
+
+    return ScheduleCache(fetcher=fetch, async_fetcher=afetch)
+
+
+def engine_windows(cache, lookback_days):
+    start = FIRST_DAY + timedelta(days=5)
+    end = FIRST_DAY + timedelta(days=DAYS - 1)
+    return list(SlidingTravelEngine(start, end, lookback_days=lookback_days, cache=cache).windows())
+
+
+@pytest.mark.parametrize("lookback_days", [0, 1, 3, 5])
+def test_engine_windows_match_schedule_windows(cache, lookback_days):
+    windows = engine_windows(cache, lookback_days)
+    assert len(windows) == DAYS - 5
+    for window in windows:
+        expected = ScheduleWindow(window.target_date, lookback_days, cache=cache)
+        assert window.travel_data == pytest.approx(expected.travel_data)
+        assert window.team_last_game == expected.team_last_game
+        day_before = window.target_date - timedelta(days=1)
+        assert window.away_teams_on(day_before) == expected.away_teams_on(day_before)
+
+
+@pytest.mark.parametrize("lookback_days", [0, 1, 3])
+@pytest.mark.parametrize("back_to_back", [True, False])
+def test_engine_best_odds_match_per_date(cache, lookback_days, back_to_back):
+    for window in engine_windows(cache, lookback_days):
+        expected = ScheduleWindow(window.target_date, lookback_days, cache=cache)
+        kwargs = dict(lookback_days=lookback_days, travel_threshold=0, require_back_to_back=back_to_back)
+        assert best_odds_for_date(window.target_date, window=window, **kwargs) == \
+            best_odds_for_date(window.target_date, window=expected, **kwargs)
+        assert get_games_with_travel_for_date(window.target_date, window=window) == \
+            get_games_with_travel_for_date(window.target_date, window=expected)
+
+
+def test_back_to_back_without_lookback_finds_picks(cache):
+    # Yesterday's away teams must be known even when the window is one day long.
+    picks = [
+        pick for window in engine_windows(cache, 0)
+        for pick in best_odds_for_date(window.target_date, lookback_days=0, travel_threshold=0,
+                                       require_back_to_back=True, window=window)
+    ]
+    assert picks
+
+
+def test_engine_reads_each_day_once(cache):
+    reads = []
+    get_table = cache.get_table
+    cache.get_table = lambda day: reads.append(day) or get_table(day)
+    engine = SlidingTravelEngine(FIRST_DAY + timedelta(days=5), FIRST_DAY + timedelta(days=10), 3, cache=cache)
+    list(engine.windows())
+    assert reads == engine.days()
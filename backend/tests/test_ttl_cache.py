@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ttl_cache import TTLCache, ttl_cache
+
+
+class SlowLoader:
+    """
+    Loader that blocks until released, counting its calls.
+    """
+    def __init__(self, result="value"):
+        self.result = result
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def run_threads(target, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def join(threads):
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_misses_share_one_load():
+    loader = SlowLoader()
+    cache = TTLCache(loader)
+    threads, results = run_threads(lambda: cache.get("k"), 8)
+    loader.started.wait(5)
+    time.sleep(0.05)
+    loader.release.set()
+    join(threads)
+
+    assert results == ["value"] * 8
+    assert loader.calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"]) == (1, 7)
+
+
+def test_load_errors_reach_every_waiter_and_are_not_cached():
+    loader = SlowLoader(result=RuntimeError("upstream down"))
+    cache = TTLCache(loader)
+    errors = []
+
+    def get():
+        try:
+            return cache.get("k")
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads, _ = run_threads(get, 4)
+    loader.started.wait(5)
+    time.sleep(0.05)
+    loader.release.set()
+    join(threads)
+
+    assert len(errors) == 4 and loader.calls == 1
+    assert cache.peek("k") is None
+
+
+def test_async_and_sync_callers_share_one_load():
+    loader = SlowLoader()
+    cache = TTLCache(loader)
+
+    async def main():
+        return await asyncio.gather(*(cache.aget("k", asyncio.to_thread, loader) for _ in range(5)))
+
+    threads, results = run_threads(lambda: cache.get("k"), 1)
+    loader.started.wait(5)
+    release = threading.Timer(0.05, loader.release.set)
+    release.start()
+    assert asyncio.run(main()) == ["value"] * 5
+    join(threads)
+
+    assert results == ["value"] and loader.calls == 1
+
+
+def test_stale_value_is_served_while_one_background_refresh_runs():
+    versions = iter(["old", "new"])
+    refreshed = threading.Event()
+    cache = TTLCache(lambda: next(versions), ttl=0.05, stale_ttl=10)
+    cache.on_store(lambda key, value: value == "new" and refreshed.set())
+
+    assert cache.get("k") == "old"
+    time.sleep(0.06)
+    assert [cache.get("k") for _ in range(5)] == ["old"] * 5
+    assert refreshed.wait(5)
+    assert cache.get("k") == "new"
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_expired_past_the_stale_window_reloads():
+    versions = iter(["old", "new"])
+    cache = TTLCache(lambda: next(versions), ttl=0.01, stale_ttl=0.01)
+    assert cache.get("k") == "old"
+    time.sleep(0.05)
+    assert cache.get("k") == "new"
+
+
+def test_invalidated_key_drops_the_load_in_flight():
+    loader = SlowLoader()
+    cache = TTLCache(loader)
+    threads, results = run_threads(lambda: cache.get("k"), 1)
+    loader.started.wait(5)
+    cache.invalidate("k")
+    loader.release.set()
+    join(threads)
+
+    assert results == ["value"]
+    assert cache.peek("k") is None
+
+
+def test_invalidated_key_drops_the_background_refresh():
+    loader = SlowLoader(result="new")
+    cache = TTLCache(loader, ttl=0.01, stale_ttl=10)
+    cache.put("k", "old")
+    time.sleep(0.02)
+    assert cache.get("k") == "old"
+    loader.started.wait(5)
+    cache.invalidate()
+    loader.release.set()
+    time.sleep(0.05)
+
+    assert cache.peek("k") is None
+
+
+def test_refresh_joins_the_load_in_flight():
+    loader = SlowLoader()
+    cache = TTLCache(loader)
+    threads, results = run_threads(lambda: cache.get("k"), 1)
+    loader.started.wait(5)
+    refresher, refreshed = run_threads(lambda: cache.refresh("k"), 1)
+    time.sleep(0.05)
+    loader.release.set()
+    join(threads + refresher)
+
+    assert results == refreshed == ["value"]
+    assert loader.calls == 1
+
+
+def test_decorator_binds_arguments_to_one_key():
+    calls = []
+
+    @ttl_cache()
+    def fetch(day, detail=False):
+        calls.append((day, detail))
+        return [day]
+
+    assert fetch("2024-01-01") == fetch(day="2024-01-01") == fetch("2024-01-01", False) == ["2024-01-01"]
+    assert fetch("2024-01-01", detail=True) == ["2024-01-01"]
+    assert calls == [("2024-01-01", False), ("2024-01-01", True)]
+    with pytest.raises(TypeError):
+        fetch(when="2024-01-01")
+
+
+def test_decorator_refresh_never_replaces_a_value_with_an_empty_one():
+    results = iter([["a"], [], ["b"]])
+
+    @ttl_cache()
+    def fetch(season):
+        return next(results)
+
+    assert fetch("20242025") == ["a"]
+    assert fetch.refresh(season="20242025") == ["a"]
+    assert fetch("20242025") == ["a"]
+    assert fetch.refresh("20242025") == ["b"]
+    assert fetch("20242025") == ["b"]
@@ -0,0 +1,434 @@
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "expires_at")
+
+    def __init__(self, value, stored_at: float, expires_at: Optional[float]):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+
+class _Flight:
+    """
+    One in-progress load. Sync waiters block on `event`; async waiters await a
+    future of their own loop, so waiting never ties up a thread. `abandoned`
+    means the leader was cancelled: waiters start over instead of failing.
+    `invalidated` means the key was invalidated during the load, so its
+    result is handed to the waiters but not stored.
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.abandoned = False
+        self.invalidated = False
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        with self._lock:
+            self.event.set()
+            futures, self._futures = self._futures, []
+        for future in futures:
+            try:
+                future.get_loop().call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # The waiter's loop has already closed.
+                pass
+
+    async def wait(self):
+        with self._lock:
+            if self.event.is_set():
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._futures.append(future)
+        await future
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TTLCache:
+    """
+    Thread-safe cache with per-key expiry, stale-while-revalidate and
+    single-flight loading.
+
+    - `ttl` is either a number of seconds or a callable (key, value) -> seconds;
+      None means the entry never expires.
+    - Within `stale_ttl` seconds after expiry, the old value is served while a
+      single background thread refreshes it.
+    - Concurrent misses for the same key wait on one call to the loader;
+      explicit and background refreshes share that in-flight load too.
+    - A load that finishes after its key was invalidated is not stored.
+    """
+    def __init__(self, loader: Callable[..., Any], ttl=None, stale_ttl: float = 0,
+                 maxsize: Optional[int] = None, name: Optional[str] = None):
+        self._loader = loader
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._maxsize = maxsize
+        self.name = name or getattr(loader, "__name__", "ttl_cache")
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.load_errors = 0
+
+    def _ttl_for(self, key, value) -> Optional[float]:
+        return self._ttl(key, value) if callable(self._ttl) else self._ttl
+
+    def _store(self, key, value):
+        now = time.monotonic()
+        ttl = self._ttl_for(key, value)
+        with self._lock:
+            self._entries[key] = _Entry(value, now, None if ttl is None else now + ttl)
+            if self._maxsize is not None and len(self._entries) > self._maxsize:
+                oldest = min(self._entries, key=lambda k: self._entries[k].stored_at)
+                del self._entries[oldest]
+        for listener in self._listeners:
+            listener(key, value)
+
+    def on_store(self, listener: Callable[[Hashable, Any], None]):
+        """
+        Registers `listener(key, value)`, called whenever a fresh value is stored.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def _begin(self, key, args, kwargs):
+        """
+        Returns (value, None, False) when the key can be served from the cache,
+        otherwise (None, flight, leader) where `leader` performs the load.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at is None or now < entry.expires_at:
+                    self.hits += 1
+                    record_cache(self.name, "hit")
+                    return entry.value, None, False
+                if now < entry.expires_at + self._stale_ttl:
+                    self.stale_hits += 1
+                    record_cache(self.name, "stale")
+                    if key not in self._inflight:
+                        flight = _Flight()
+                        self._inflight[key] = flight
+                        self._refresh_in_background(key, flight, args, kwargs)
+                    return entry.value, None, False
+                del self._entries[key]
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+                record_cache(self.name, "miss")
+                return None, flight, True
+            self.coalesced += 1
+            record_cache(self.name, "coalesced")
+            return None, flight, False
+
+    def _lead(self, key):
+        """
+        Registers a load of `key` that is not a lookup (a refresh): returns
+        (flight, True) if this caller leads it, or the load already in flight.
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                record_cache(self.name, "coalesced")
+                return flight, False
+            flight = _Flight()
+            self._inflight[key] = flight
+            return flight, True
+
+    def _finish(self, key, flight, value=None, error=None, store=True):
+        if error is None:
+            # Only stored if the key was not invalidated while loading.
+            if store and not flight.invalidated:
+                self._store(key, value)
+        else:
+            self.load_errors += 1
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.value = value
+        flight.error = error
+        flight.done()
+
+    def _abandon(self, key, flight):
+        # The leader was cancelled or interrupted: nothing is cached and no
+        # error is handed out; waiters retry and one of them leads the next load.
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.abandoned = True
+        flight.done()
+
+    def _refresh_in_background(self, key, flight, args, kwargs):
+        def refresh():
+            try:
+                value = self._loader(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                logger.warning("Background refresh of %s%s failed: %s", self.name, args, e)
+            except BaseException:
+                self._abandon(key, flight)
+                raise
+            else:
+                self._finish(key, flight, value)
+                self.refreshes += 1
+
+        threading.Thread(target=refresh, name=f"refresh-{self.name}", daemon=True).start()
+
+    @staticmethod
+    def _result(flight):
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def get(self, key, *args, **kwargs):
+        """
+        Returns the value for `key`, calling loader(*args, **kwargs) on a miss.
+        Loader errors are raised to every waiting caller and never cached.
+        """
+        while True:
+            value, flight, leader = self._begin(key, args, kwargs)
+            if flight is None:
+                return value
+            if not leader:
+                flight.event.wait()
+                if flight.abandoned:
+                    continue
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            try:
+                value = self._loader(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            except BaseException:
+                self._abandon(key, flight)
+                raise
+            self._finish(key, flight, value)
+            return value
+
+    async def aget(self, key, async_loader: Callable[..., Awaitable[Any]], *args, **kwargs):
+        """
+        Async variant of get: a miss awaits async_loader(*args, **kwargs) instead
+        of blocking. Sync and async callers share entries and in-flight loads.
+        """
+        while True:
+            value, flight, leader = self._begin(key, args, kwargs)
+            if flight is None:
+                return value
+            if not leader:
+                await flight.wait()
+                if flight.abandoned:
+                    continue
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            try:
+                value = await async_loader(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            except BaseException:
+                # Cancellation (e.g. the client disconnected) is this caller's
+                # own outcome, not a load error to share with the waiters.
+                self._abandon(key, flight)
+                raise
+            self._finish(key, flight, value)
+            return value
+
+    def refresh(self, key, *args, keep: Optional[Callable[[Any, Any], bool]] = None, **kwargs):
+        """
+        Calls loader(*args, **kwargs) now even if `key` is cached, and stores
+        the result unless `keep(previous, value)` says to keep the cached
+        value. Readers are served the old value until the load finishes. If
+        `key` is already loading, the caller waits for that load instead.
+        Returns the value the key ends up with.
+        """
+        while True:
+            flight, leader = self._lead(key)
+            if not leader:
+                flight.event.wait()
+                if flight.abandoned:
+                    continue
+                return self._result(flight)
+            try:
+                value = self._loader(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            except BaseException:
+                self._abandon(key, flight)
+                raise
+            return self._finish_refresh(key, flight, value, keep)
+
+    async def arefresh(self, key, async_loader: Callable[..., Awaitable[Any]], *args,
+                       keep: Optional[Callable[[Any, Any], bool]] = None, **kwargs):
+        """
+        Async variant of refresh, awaiting async_loader(*args, **kwargs).
+        """
+        while True:
+            flight, leader = self._lead(key)
+            if not leader:
+                await flight.wait()
+                if flight.abandoned:
+                    continue
+                return self._result(flight)
+            try:
+                value = await async_loader(*args, **kwargs)
+            except Exception as e:
+                self._finish(key, flight, error=e)
+                raise
+            except BaseException:
+                self._abandon(key, flight)
+                raise
+            return self._finish_refresh(key, flight, value, keep)
+
+    def _finish_refresh(self, key, flight, value, keep):
+        previous = self.peek(key)
+        if keep is not None and previous is not None and keep(previous, value):
+            self._finish(key, flight, previous, store=False)
+            return previous
+        self._finish(key, flight, value)
+        self.refreshes += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores `value` as a freshly loaded entry for `key`, replacing any old one.
+        Counted as a refresh in stats().
+        """
+        self._store(key, value)
+        self.refreshes += 1
+
+    def peek(self, key):
+        """
+        Returns the cached value for `key` regardless of age, or None.
+        """
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def invalidate(self, key=None):
+        """
+        Drops `key` (or every key). A load of it that is in flight still
+        answers its waiters but does not store its result.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                flights = list(self._inflight.values())
+            else:
+                self._entries.pop(key, None)
+                flights = [self._inflight[key]] if key in self._inflight else []
+            for flight in flights:
+                flight.invalidated = True
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - e.stored_at for e in self._entries.values()]
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "load_errors": self.load_errors,
+                "oldest_age_seconds": round(max(ages), 1) if ages else None,
+                "newest_age_seconds": round(min(ages), 1) if ages else None,
+            }
+
+
+_registry: Dict[str, TTLCache] = {}
+
+
+def register_cache(cache: TTLCache) -> TTLCache:
+    """
+    Adds a directly constructed TTLCache to the metrics reported by cache_stats().
+    """
+    _registry[cache.name] = cache
+    return cache
+
+
+def _call_key(signature: inspect.Signature, args, kwargs) -> tuple:
+    """
+    Cache key of one call: the value bound to every parameter, defaults
+    included, so f(d), f(day=d) and f(d, default) share an entry.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tuple(
+        tuple(sorted(value.items())) if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD else value
+        for name, value in bound.arguments.items()
+    )
+
+
+def _keep_truthy(previous, value) -> bool:
+    return not value and bool(previous)
+
+
+def ttl_cache(ttl=None, stale_ttl: float = 0, maxsize: Optional[int] = None):
+    """
+    Decorator form of TTLCache. The call's arguments, bound to the function's
+    signature, form the key. The wrapper exposes `cache`, `refresh()`,
+    `cache_clear()` and `cache_info()`.
+    """
+    def decorator(fn):
+        cache = register_cache(TTLCache(fn, ttl=ttl, stale_ttl=stale_ttl, maxsize=maxsize, name=fn.__name__))
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return cache.get(_call_key(signature, args, kwargs), *args, **kwargs)
+
+        def refresh(*args, **kwargs):
+            """
+            Reloads the entry for these arguments now. Readers keep getting the
+            old value until the load succeeds, and a falsy result (such as the
+            empty list of a failed fetch) never replaces a truthy one.
+            A key that is not cached yet is loaded through the normal path.
+            """
+            key = _call_key(signature, args, kwargs)
+            if cache.peek(key) is None:
+                return wrapper(*args, **kwargs)
+            return cache.refresh(key, *args, keep=_keep_truthy, **kwargs)
+
+        wrapper.cache = cache
+        wrapper.refresh = refresh
+        wrapper.cache_clear = cache.invalidate
+        wrapper.cache_info = cache.stats
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Metrics for every cache created through @ttl_cache.
+    """
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -0,0 +1,223 @@
+"""
+Checks that ORM writes keep the NFL rollup tables (nfl_team_season_records
+and nfl_player_season_stats) equal to what rebuild_team_season_records()
+and rebuild_player_season_stats() compute from the raw rows.
+
+Seeds a scratch database at migration 0001 with the query benchmark's
+synthetic seasons and upgrades it to head, whose migrations backfill the
+rollups; that backfill is checked first. Then runs each scenario in its own SessionLocal session (inserts, updates,
+deletes, a game moving to another season, a flush that is rolled back) and
+compares the rollups after every commit:
+
+    python verify_nfl_rollups.py
+    python verify_nfl_rollups.py --database-url postgresql://localhost/nfl_verify
+
+The database at --database-url must be a scratch database: its NFL tables
+are dropped and recreated. Exits with status 1 if any scenario leaves a
+rollup out of step.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Callable, Dict, List
+
+from alembic import command
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+import nfl_models
+from bench_nfl_queries import alembic_config, seed
+
+ROLLUPS = (nfl_models.NflTeamSeasonRecord.__table__, nfl_models.NflPlayerSeasonStats.__table__)
+
+
+def rollup_rows(db) -> Dict[str, Dict[tuple, tuple]]:
+    """
+    Every rollup row by primary key. Rows whose totals are all zero are left
+    out: a delete can leave one behind, while a rebuild never writes one.
+    """
+    snapshot = {}
+    for table in ROLLUPS:
+        keys = [column.name for column in table.primary_key.columns]
+        values = [column for column in table.columns if column.name not in keys]
+        rows = {}
+        for row in db.execute(select(*table.primary_key.columns, *values)):
+            totals = tuple(round(value, 6) if isinstance(value, float) else value for value in row[len(keys):])
+            if any(totals):
+                rows[tuple(row[:len(keys)])] = totals
+        snapshot[table.name] = rows
+    return snapshot
+
+
+def rebuilt_rows(engine) -> Dict[str, Dict[tuple, tuple]]:
+    """
+    The rollups as the rebuild functions compute them, in a transaction
+    that is rolled back.
+    """
+    with Session(engine) as db:
+        nfl_models.rebuild_team_season_records(db)
+        nfl_models.rebuild_player_season_stats(db)
+        rows = rollup_rows(db)
+        db.rollback()
+    return rows
+
+
+def differences(actual, expected) -> List[str]:
+    problems = []
+    for table, expected_rows in expected.items():
+        actual_rows = actual[table]
+        for key in sorted(set(actual_rows) | set(expected_rows)):
+            if actual_rows.get(key) != expected_rows.get(key):
+                problems.append(f"{table} {key}: {actual_rows.get(key)} != rebuilt {expected_rows.get(key)}")
+    return problems
+
+
+def insert_game(db, game_id="verify-insert"):
+    home, away = db.query(nfl_models.NflTeam).order_by(nfl_models.NflTeam.team_id).limit(2).all()
+    game = nfl_models.NflGame(
+        game_id=game_id, season="2024", game_date="2024-12-31", status=nfl_models.REGULAR_SEASON,
+        week="18", home_team_id=home.team_id, home_team_name=home.name, home_team_abbr=home.abbreviation,
+        home_team_score=24, away_team_id=away.team_id, away_team_name=away.name,
+        away_team_abbr=away.abbreviation, away_team_score=24,
+    )
+    db.add(game)
+    for team in (home, away):
+        for player in db.query(nfl_models.NflPlayer).filter_by(team=team.abbreviation).limit(3):
+            db.add(nfl_models.NflPlayerGameStats(
+                player_id=player.player_id, game_id=game.game_id, team=team.abbreviation,
+                position=player.position, passing_yards=210.5, rushing_yards=12.0, carries=4, tackles=2,
+            ))
+
+
+def update_rows(db):
+    games = db.query(nfl_models.NflGame).filter_by(season="2024").order_by(nfl_models.NflGame.game_id)
+    for i, game in enumerate(games.limit(6)):
+        if i % 3 == 0:
+            game.home_team_score, game.away_team_score = game.away_team_score, (game.home_team_score or 0) + 1
+        elif i % 3 == 1:
+            game.status = "POST" if game.status == nfl_models.REGULAR_SEASON else nfl_models.REGULAR_SEASON
+        else:
+            game.away_team_score = None
+    lines = db.query(nfl_models.NflPlayerGameStats).order_by(nfl_models.NflPlayerGameStats.game_id)
+    for i, line in enumerate(lines.limit(10)):
+        line.passing_yards = (line.passing_yards or 0) + 7.5
+        line.tackles = None if i % 2 else (line.tackles or 0) + 1
+
+
+def move_stat_line(db):
+    # A stat line reassigned to a game of another season.
+    line = db.query(nfl_models.NflPlayerGameStats).join(nfl_models.NflGame).filter(
+        nfl_models.NflGame.season == "2024").first()
+    played = select(nfl_models.NflPlayerGameStats.game_id).where(
+        nfl_models.NflPlayerGameStats.player_id == line.player_id)
+    other = db.query(nfl_models.NflGame).filter(
+        nfl_models.NflGame.season == "2023", nfl_models.NflGame.home_team_score.isnot(None),
+        nfl_models.NflGame.game_id.not_in(played)).first()
+    line.game_id = other.game_id
+
+
+def delete_rows(db):
+    game = db.query(nfl_models.NflGame).filter_by(season="2023").order_by(nfl_models.NflGame.game_id).first()
+    for line in game.player_stats:
+        db.delete(line)
+    db.delete(game)
+    db.delete(db.query(nfl_models.NflPlayerGameStats).order_by(nfl_models.NflPlayerGameStats.player_id).first())
+
+
+def move_game_season(db):
+    # Some of the game's stat lines change in the same flush as its season.
+    game = db.query(nfl_models.NflGame).filter_by(season="2024", status=nfl_models.REGULAR_SEASON).first()
+    game.season = "2023"
+    edited, deleted = game.player_stats[:2]
+    edited.rushing_yards = (edited.rushing_yards or 0) + 30.0
+    db.delete(deleted)
+    in_game = {line.player_id for line in game.player_stats}
+    player = next(player for player in db.query(nfl_models.NflPlayer).filter_by(team=game.home_team_abbr)
+                  if player.player_id not in in_game)
+    db.add(nfl_models.NflPlayerGameStats(player_id=player.player_id, game_id=game.game_id,
+                                         team=game.home_team_abbr, position=player.position, tackles=3))
+
+
+def rolled_back_flush(db):
+    # Flushed changes that never commit must leave no trace in the rollups.
+    insert_game(db, game_id="verify-rollback")
+    db.flush()
+    update_rows(db)
+    move_game_season(db)
+    db.flush()
+    db.rollback()
+
+
+def migration_backfill(db):
+    # Nothing to change: the rollups as the migrations backfilled them.
+    pass
+
+
+SCENARIOS: Dict[str, Callable[[Session], None]] = {
+    "migration backfill": migration_backfill,
+    "insert": insert_game,
+    "update": update_rows,
+    "stat line to another season": move_stat_line,
+    "delete": delete_rows,
+    "game to another season": move_game_season,
+    "rollback": rolled_back_flush,
+}
+
+
+def prepare_database(database_url: str, seasons: int = 2):
+    """
+    Recreates the NFL tables at `database_url` at migration 0001, seeds
+    `seasons` synthetic seasons and upgrades to head. Returns an engine.
+    """
+    config = alembic_config(database_url)
+    engine = create_engine(database_url)
+    command.downgrade(config, "base")
+    if inspect(engine).has_table("alembic_version"):
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE alembic_version")
+    command.upgrade(config, "0001")
+    seed(engine, [str(2024 - i) for i in reversed(range(seasons))], upcoming_season="2025")
+    command.upgrade(config, "head")
+    engine.dispose()
+    return engine
+
+
+def run_scenario(engine, scenario: Callable[[Session], None]) -> List[str]:
+    """
+    Runs `scenario` in its own SessionLocal session, commits, and returns the
+    rollup rows that differ from a rebuild.
+    """
+    db = nfl_models.SessionLocal(bind=engine)
+    try:
+        scenario(db)
+        db.commit()
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        actual = rollup_rows(conn)
+    return differences(actual, rebuilt_rows(engine))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--seasons", type=int, default=2, help="seasons of games to seed, ending with 2024")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'nfl_verify.sqlite3')}"
+    engine = prepare_database(database_url, args.seasons)
+
+    failed = 0
+    for name, scenario in SCENARIOS.items():
+        problems = run_scenario(engine, scenario)
+        print(f"{name:<30} {'ok' if not problems else f'{len(problems)} rows differ'}")
+        for problem in problems[:10]:
+            print(f"    {problem}")
+        failed += bool(problems)
+    engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())